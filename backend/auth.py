@@ -4,9 +4,11 @@ from jose import JWTError, jwt
 import bcrypt
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import models
-from database import get_db
+import user_cache
+from database import get_async_db
 
 # Configuration
 SECRET_KEY = "your-secret-key-keep-it-secret" # In production, use env var
@@ -62,7 +64,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -76,12 +78,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await db.run_sync(_load_user, email)
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_user_optional(token: str = Depends(oauth2_scheme_optional), db: Session = Depends(get_db)):
+async def get_current_user_optional(token: str = Depends(oauth2_scheme_optional), db: AsyncSession = Depends(get_async_db)):
     if not token:
         return None
     try:
@@ -92,5 +94,22 @@ async def get_current_user_optional(token: str = Depends(oauth2_scheme_optional)
     except JWTError:
         return None
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    return await db.run_sync(_load_user, email)
+
+def _load_user(db: Session, email: str) -> Optional[models.User]:
+    """User for a token subject, from the user cache when possible (the result is detached).
+    Called through AsyncSession.run_sync, so its queries go through the async driver."""
+    user = user_cache.cache.get(email, db)
+    if user is None:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        if user is not None:
+            user_cache.cache.put(email, user, db)
     return user
+
+def load_user_for_update(user: models.User, db: Session) -> models.User:
+    """A session-bound copy of the current user to modify; call user_cache.cache.invalidate after commit"""
+    return db.get(models.User, user.id)
+
+async def load_user_for_update_async(user: models.User, db: AsyncSession) -> models.User:
+    """load_user_for_update for async endpoints using get_async_db"""
+    return await db.get(models.User, user.id)
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from sqlalchemy.orm import load_only
+
+import job_sources
+import models
+import search_cache
+from database import SessionLocal
+from schemas import JobSearchRequest
+from scrapers import google_search
+from search_snapshots import SEARCH_SNAPSHOT_DEPTH
+
+CACHE_WARM_ENABLED = os.getenv("CACHE_WARM_ENABLED", "true").lower() == "true"
+CACHE_WARM_INTERVAL = int(os.getenv("CACHE_WARM_INTERVAL", "900"))  # Seconds between runs (the cache TTL)
+CACHE_WARM_MAX_SEARCHES = int(os.getenv("CACHE_WARM_MAX_SEARCHES", "10"))  # Per run
+CACHE_WARM_QUOTA_RESERVE = int(os.getenv("CACHE_WARM_QUOTA_RESERVE", "50"))  # CSE queries always left to users
+CACHE_WARM_ACTIVE_DAYS = int(os.getenv("CACHE_WARM_ACTIVE_DAYS", "7"))  # Only users who searched this recently
+CACHE_WARM_PAIRS_PER_USER = 3  # First N job preferences x first N locations of each user
+
+
+def collect_targets() -> List[Tuple[Tuple[str, str], int]]:
+    """Distinct (job preference, location) pairs across recently active users, most shared first."""
+    db = SessionLocal()
+    try:
+        # A signed-in search that shows new jobs updates the user's seen set
+        active_since = datetime.utcnow() - timedelta(days=CACHE_WARM_ACTIVE_DAYS)
+        users = db.query(models.User).join(models.SeenJobSet, models.SeenJobSet.user_id == models.User.id).filter(
+            models.SeenJobSet.updated_at >= active_since
+        ).options(
+            load_only(models.User.job_preferences, models.User.preferred_locations)
+        ).all()
+        counts = Counter()
+        for user in users:
+            roles = [r.strip() for r in (user.job_preferences or [])[:CACHE_WARM_PAIRS_PER_USER] if r and r.strip()]
+            locations = [l.strip() for l in (user.preferred_locations or [])[:CACHE_WARM_PAIRS_PER_USER] if l and l.strip()] or [""]
+            for role in roles:
+                for location in locations:
+                    counts[(role, location)] += 1
+        return counts.most_common()
+    finally:
+        db.close()
+
+
+def warm_request(role: str, location: str = "") -> JobSearchRequest:
+    """The first-page window /search ranks for this role and location (same cache key)."""
+    # Internal window depth, not a client page size, so it skips the per-request limit bound
+    return JobSearchRequest(query=role, location=location).copy(update={"limit": SEARCH_SNAPSHOT_DEPTH})
+
+
+class CacheWarmer:
+    """
+    Periodically pre-runs the searches recently active users' saved
+    preferences predict, so the first /search after login (and the "New
+    Jobs Found" notification) is answered from the cache. Each run
+    refreshes at most `max_searches` entries that are missing or stale,
+    most popular first, and stops spending Custom Search queries once only
+    `quota_reserve` of the day's quota (counted in the database, so shared
+    by workers and restarts) are left for interactive searches. The first
+    run waits one interval, so redeploys and cold starts spend nothing.
+    """
+
+    def __init__(self, interval: int = CACHE_WARM_INTERVAL, max_searches: int = CACHE_WARM_MAX_SEARCHES, quota_reserve: int = CACHE_WARM_QUOTA_RESERVE):
+        self.interval = interval
+        self.max_searches = max_searches
+        self.quota_reserve = quota_reserve
+        self._task = None
+        self.runs = 0
+        self.warmed = 0
+        self.skipped_fresh = 0
+        self.skipped_quota = 0
+        self.errors = 0
+        self.last_run_at = None
+        self.last_run_ms = 0.0
+
+    def _quota_allows(self) -> bool:
+        if not google_search.is_configured():
+            return True
+        pages = len(google_search._page_starts(1, SEARCH_SNAPSHOT_DEPTH))
+        return google_search.quota.available() >= self.quota_reserve + pages
+
+    async def warm_once(self) -> int:
+        """Run one warming pass. Returns the number of searches refreshed."""
+        started = time.perf_counter()
+        targets = await asyncio.to_thread(collect_targets)
+        warmed = 0
+        for (role, location), _ in targets:
+            if warmed >= self.max_searches:
+                break
+            request = warm_request(role, location)
+            key = search_cache.make_key(request)
+            cached, is_stale = search_cache.cache.get(key)
+            if cached is not None and not is_stale:
+                self.skipped_fresh += 1
+                continue
+            if not await asyncio.to_thread(self._quota_allows):
+                self.skipped_quota += 1
+                print("DEBUG: Cache warmer stopping, Custom Search quota reserved for users")
+                break
+            try:
+                result = await job_sources.aggregator.search(request)
+                ttl = search_cache.SEARCH_CACHE_DEGRADED_TTL if result.degraded else None
+                search_cache.cache.set(key, result.jobs, ttl, result.raw_count)
+                warmed += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Cache warm failed for '{role}' in '{location}': {e}")
+
+        self.runs += 1
+        self.warmed += warmed
+        self.last_run_at = time.time()
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        print(f"DEBUG: Cache warmer refreshed {warmed} of {len(targets)} preference searches")
+        return warmed
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.warm_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Cache warmer run failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": CACHE_WARM_ENABLED,
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "warmed": self.warmed,
+            "skipped_fresh": self.skipped_fresh,
+            "skipped_quota": self.skipped_quota,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at,
+            "last_run_ms": round(self.last_run_ms, 1),
+        }
+
+
+# Process-wide warmer started with the application
+warmer = CacheWarmer()
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
 import os
-import google.generativeai as genai
-from database import get_db
+import http_client
+from database import get_async_db
 import models
 import auth
 import json
@@ -21,10 +21,24 @@ SKILL_KNOWLEDGE_BASE = {
 
 router = APIRouter(prefix="/chat", tags=["chatbot"])
 
-# Configure Gemini
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
+# Gemini REST API, called through the shared outbound client
+GEMINI_MODEL = "gemini-pro-latest"
+GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+GEMINI_DEADLINE = float(os.getenv("GEMINI_DEADLINE", "20.0"))
+
+async def generate_gemini_reply(api_key: str, history: List[dict], prompt: str) -> str:
+    """Send the conversation plus the new prompt to Gemini and return the reply text."""
+    contents = history + [{"role": "user", "parts": [{"text": prompt}]}]
+    response = await http_client.client.post(
+        GEMINI_URL,
+        params={"key": api_key},
+        json={"contents": contents},
+        deadline=GEMINI_DEADLINE,
+        retries=1
+    )
+    response.raise_for_status()
+    data = response.json()
+    return data["candidates"][0]["content"]["parts"][0]["text"]
 
 class ChatMessage(BaseModel):
     role: str
@@ -66,15 +80,13 @@ def get_user_context(user: models.User):
 async def chat_endpoint(
     request: ChatRequest, 
     current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
          # Mock response if no key
          return ChatResponse(reply="I can help you with that, but first the developer needs to configure the GOOGLE_API_KEY in the backend environment variables to enable my AI brain!")
 
-    genai.configure(api_key=api_key)
-
     try:
         # 1. Build Context
         if current_user:
@@ -97,10 +109,7 @@ async def chat_endpoint(
         - Be encouraging and professional.
         """
         
-        # 3. Model Init
-        model = genai.GenerativeModel('gemini-pro-latest')
-        
-        # 4. Construct Chat History for Gemini
+        # 3. Construct Chat History for Gemini
         gemini_history = []
         
         # Add system instruction as the first part of the conversation if possible, 
@@ -113,18 +122,15 @@ async def chat_endpoint(
         
         for msg in request.history:
             role = "user" if msg.role == "user" else "model"
-            gemini_history.append({"role": role, "parts": [msg.content]})
+            gemini_history.append({"role": role, "parts": [{"text": msg.content}]})
             
-        # 5. Start Chat Session
-        chat = model.start_chat(history=gemini_history)
-        
-        # 6. Send Message with Context
+        # 4. Send Message with Context
         # We attach the system prompt to the user's current message to ensure it's in focus
         full_prompt = f"{system_instruction}\n\nUser Question: {request.message}"
         
-        response = chat.send_message(full_prompt)
+        reply = await generate_gemini_reply(api_key, gemini_history, full_prompt)
         
-        return ChatResponse(reply=response.text)
+        return ChatResponse(reply=reply)
         
     except Exception as e:
         print(f"Gemini Error: {e}")
@@ -0,0 +1,222 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from suggestions import POPULAR_COMPANIES
+
+# Size and industry of the seed companies, plus the other names postings use for them.
+# Sizes are the frontend's COMPANY_SIZES.
+COMPANY_PROFILES = {
+    "Google": ("MNC", "Technology", ["Alphabet", "Google India"]),
+    "Facebook": ("MNC", "Technology", []),
+    "Meta": ("MNC", "Technology", ["Meta Platforms"]),
+    "Amazon": ("MNC", "Technology", ["Amazon.com", "Amazon Web Services", "AWS"]),
+    "Apple": ("MNC", "Technology", []),
+    "Netflix": ("Large", "Media", []),
+    "Microsoft": ("MNC", "Technology", []),
+    "IBM": ("MNC", "Technology", ["International Business Machines"]),
+    "Oracle": ("MNC", "Technology", []),
+    "SAP": ("MNC", "Technology", ["SAP Labs"]),
+    "Adobe": ("MNC", "Technology", []),
+    "Salesforce": ("MNC", "Technology", []),
+    "Intel": ("MNC", "Semiconductors", []),
+    "NVIDIA": ("MNC", "Semiconductors", []),
+    "Cisco": ("MNC", "Technology", ["Cisco Systems"]),
+    "VMware": ("Large", "Technology", []),
+    "Dell": ("MNC", "Technology", ["Dell Technologies"]),
+    "HP": ("MNC", "Technology", ["Hewlett Packard", "Hewlett-Packard", "HP Inc", "Hewlett Packard Enterprise", "HPE"]),
+    "Qualcomm": ("MNC", "Semiconductors", []),
+    "TCS": ("MNC", "IT Services", ["Tata Consultancy Services"]),
+    "Infosys": ("MNC", "IT Services", []),
+    "Wipro": ("MNC", "IT Services", []),
+    "HCL": ("MNC", "IT Services", ["HCLTech", "HCL Technologies"]),
+    "Tech Mahindra": ("MNC", "IT Services", []),
+    "Cognizant": ("MNC", "IT Services", ["Cognizant Technology Solutions"]),
+    "Capgemini": ("MNC", "IT Services", []),
+    "Accenture": ("MNC", "IT Services", []),
+    "LTI": ("MNC", "IT Services", ["LTIMindtree", "Larsen & Toubro Infotech"]),
+    "Mindtree": ("Large", "IT Services", []),
+    "Mphasis": ("Large", "IT Services", []),
+    "Uber": ("Large", "Technology", []),
+    "Airbnb": ("Large", "Technology", []),
+    "Stripe": ("Large", "Fintech", []),
+    "Spotify": ("Large", "Media", []),
+    "Slack": ("Mid-size", "Technology", []),
+    "Zoom": ("Large", "Technology", ["Zoom Video Communications"]),
+    "Dropbox": ("Mid-size", "Technology", []),
+    "Atlassian": ("Large", "Technology", []),
+    "Shopify": ("Large", "E-commerce", []),
+    "Square": ("Large", "Fintech", ["Block"]),
+    "PayPal": ("MNC", "Fintech", []),
+    "Twitter": ("Large", "Media", []),
+    "LinkedIn": ("Large", "Technology", []),
+    "Flipkart": ("Large", "E-commerce", []),
+    "Paytm": ("Large", "Fintech", ["One97 Communications"]),
+    "Ola": ("Large", "Technology", ["ANI Technologies", "Ola Cabs"]),
+    "Swiggy": ("Large", "E-commerce", ["Bundl Technologies"]),
+    "Zomato": ("Large", "E-commerce", []),
+    "PhonePe": ("Large", "Fintech", []),
+    "CRED": ("Startup", "Fintech", ["Dreamplug Technologies"]),
+    "Razorpay": ("Mid-size", "Fintech", []),
+    "Freshworks": ("Large", "Technology", []),
+    "Zoho": ("Large", "Technology", ["Zoho Corporation"]),
+    "InMobi": ("Mid-size", "Advertising", []),
+    "Byju's": ("Large", "Education", ["Think and Learn", "BYJUS"]),
+    "McKinsey": ("MNC", "Consulting", ["McKinsey & Company"]),
+    "BCG": ("MNC", "Consulting", ["Boston Consulting Group"]),
+    "Bain": ("Large", "Consulting", ["Bain & Company"]),
+    "Deloitte": ("MNC", "Consulting", []),
+    "PwC": ("MNC", "Consulting", ["PricewaterhouseCoopers"]),
+    "EY": ("MNC", "Consulting", ["Ernst & Young", "Ernst and Young"]),
+    "KPMG": ("MNC", "Consulting", []),
+    "Goldman Sachs": ("MNC", "Finance", []),
+    "Morgan Stanley": ("MNC", "Finance", []),
+    "JP Morgan": ("MNC", "Finance", ["JPMorgan", "JPMorgan Chase", "J.P. Morgan", "JPMC"]),
+    "Citibank": ("MNC", "Finance", ["Citi", "Citigroup"]),
+    "HSBC": ("MNC", "Finance", []),
+    "Barclays": ("MNC", "Finance", []),
+    "Deutsche Bank": ("MNC", "Finance", []),
+}
+
+# Words that decorate a company name in postings without changing which company it is
+_NOISE = {
+    "careers", "career", "jobs", "job", "hiring", "recruitment", "official",
+    "inc", "llc", "llp", "ltd", "limited", "pvt", "private", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "the",
+}
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Trailing words naming a regional arm ("Amazon India"), dropped for a second exact lookup
+_REGION_SUFFIXES = {"india", "usa", "us", "uk", "emea", "apac", "global"}
+
+NGRAM = 3
+MIN_SIMILARITY = 0.9  # Dice coefficient of character trigrams for a fuzzy match (spelling variants only)
+CACHE_SIZE = 4096
+
+
+def normalize(name: Optional[str]) -> str:
+    """Lowercase words with punctuation, '&' and corporate/careers noise removed."""
+    words = _WORD_RE.findall((name or "").lower().replace("&", " and ").replace("'", ""))
+    words = [word for word in words if word not in _NOISE]
+    while words and words[-1] == "and":  # "JPMorgan Chase & Co." once "co" is gone
+        words.pop()
+    return " ".join(words)
+
+
+def _ngrams(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + NGRAM] for i in range(len(padded) - NGRAM + 1)}
+
+
+class Company:
+    def __init__(self, company_id: int, name: str, size: str, industry: str):
+        self.id = company_id
+        self.name = name
+        self.size = size
+        self.industry = industry
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "size": self.size, "industry": self.industry}
+
+
+class CompanyDirectory:
+    """
+    Canonical companies with size and industry, and an alias index that
+    resolves the raw names found in postings ("Google Careers", "Tech
+    Mahindra Ltd", "JPMorgan Chase & Co.") to them.
+
+    Resolution is an exact hash lookup of the normalized name, retried
+    without a trailing region word ("amazon india" -> "amazon"). Partial
+    matches are not accepted: "Square Yards" is not Square and "Apple
+    Hospitality" is not Apple. Only with `fuzzy` is a character-trigram
+    index also consulted, for near-identical spellings; callers that
+    store or merge by company never use it. Answers (including misses)
+    are cached, so repeated names cost one dict lookup.
+    """
+
+    def __init__(self):
+        self.companies: List[Company] = []
+        self._aliases: Dict[str, int] = {}
+        self._ngram_postings: Dict[str, Set[str]] = {}
+        self._alias_ngrams: Dict[str, Set[str]] = {}
+        self._cache: "OrderedDict[tuple, Optional[int]]" = OrderedDict()  # (key, fuzzy) -> company id
+
+    def add(self, name: str, size: str, industry: str, aliases: List[str] = ()) -> Company:
+        company = Company(len(self.companies), name, size, industry)
+        self.companies.append(company)
+        for alias in [name, *aliases]:
+            self.add_alias(alias, company.id)
+        return company
+
+    def add_alias(self, alias: str, company_id: int):
+        key = normalize(alias)
+        if not key or key in self._aliases:
+            return
+        self._aliases[key] = company_id
+        grams = _ngrams(key)
+        self._alias_ngrams[key] = grams
+        for gram in grams:
+            self._ngram_postings.setdefault(gram, set()).add(key)
+        self._cache.clear()
+
+    def _lookup(self, key: str, fuzzy: bool) -> Optional[int]:
+        company_id = self._aliases.get(key)
+        if company_id is not None:
+            return company_id
+
+        words = key.split()
+        if len(words) > 1 and words[-1] in _REGION_SUFFIXES:
+            company_id = self._aliases.get(" ".join(words[:-1]))
+            if company_id is not None or not fuzzy:
+                return company_id
+        if not fuzzy:
+            return None
+
+        grams = _ngrams(key)
+        overlap: Dict[str, int] = {}
+        for gram in grams:
+            for alias in self._ngram_postings.get(gram, ()):
+                overlap[alias] = overlap.get(alias, 0) + 1
+        best, best_score = None, MIN_SIMILARITY
+        for alias, shared in overlap.items():
+            score = 2 * shared / (len(grams) + len(self._alias_ngrams[alias]))
+            if score >= best_score:
+                best, best_score = alias, score
+        return self._aliases[best] if best is not None else None
+
+    def resolve(self, name: Optional[str], fuzzy: bool = False) -> Optional[Company]:
+        """The canonical company for a raw name, or None if it is not in the directory."""
+        key = normalize(name)
+        if not key:
+            return None
+        cache_key = (key, fuzzy)
+        if cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            company_id = self._cache[cache_key]
+        else:
+            company_id = self._lookup(key, fuzzy)
+            self._cache[cache_key] = company_id
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return self.companies[company_id] if company_id is not None else None
+
+    def canonical_name(self, name: Optional[str]) -> Optional[str]:
+        """Canonical name if known, else the raw name unchanged."""
+        company = self.resolve(name)
+        return company.name if company else name
+
+    def company_key(self, name: Optional[str]) -> str:
+        """Stable key for grouping and deduplicating by company (normalized raw name if unknown)."""
+        company = self.resolve(name)
+        return f"company:{company.id}" if company else normalize(name)
+
+
+def build_default_directory() -> CompanyDirectory:
+    directory = CompanyDirectory()
+    for name in POPULAR_COMPANIES:
+        size, industry, aliases = COMPANY_PROFILES.get(name, ("Unknown", "Unknown", []))
+        directory.add(name, size, industry, aliases)
+    return directory
+
+
+# Process-wide directory seeded from suggestions.POPULAR_COMPANIES
+directory = build_default_directory()
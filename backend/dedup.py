@@ -0,0 +1,168 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from company_directory import directory
+from schemas import Job, JobLink
+from search_index import tokenize
+
+SIMHASH_BITS = 64
+LSH_BANDS = 8  # 8 bands of 8 bits: any pair within 7 bits shares a band
+MAX_DISTANCE = 4  # Hamming distance at which two postings count as the same job
+SNIPPET_TOKENS = 8  # Snippets differ most between mirrors, so only their start counts
+
+_ABBREVIATIONS = {"sr": "senior", "jr": "junior", "dev": "developer", "engr": "engineer", "mgr": "manager"}
+# Old and new names of the same city, so mirrors using either still match
+_CITY_ALIASES = {"bangalore": "bengaluru", "bombay": "mumbai", "gurgaon": "gurugram", "madras": "chennai", "calcutta": "kolkata", "new delhi": "delhi"}
+_COMPANY_NOISE = {"careers", "career", "jobs", "hiring", "corp", "corporation", "co", "company", "ltd", "inc", "llc", "pvt", "limited", "private"}
+
+# Platform label for a result host, used when merging mirrors of a posting
+_HOST_SOURCES = {
+    "linkedin.com": "LinkedIn",
+    "indeed.com": "Indeed",
+    "glassdoor.com": "Glassdoor",
+    "glassdoor.co.in": "Glassdoor",
+    "naukri.com": "Naukri",
+}
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _title_tokens(title: str) -> List[str]:
+    return [_ABBREVIATIONS.get(t, t) for t in tokenize(title)]
+
+
+def _company_tokens(company: str) -> List[str]:
+    # Aliases of a known company ("TCS", "Tata Consultancy Services") hash alike
+    return [t for t in tokenize(directory.canonical_name(company)) if t not in _COMPANY_NOISE]
+
+
+def city_key(location: Optional[str]) -> str:
+    """Normalized city of a location ("Bangalore, Karnataka, India" -> "bengaluru"); "" when unknown."""
+    name = " ".join(tokenize((location or "").split(",")[0]))
+    return _CITY_ALIASES.get(name, name)
+
+
+def simhash(job: Job) -> int:
+    """64-bit SimHash of the normalized title (+ bigrams), company, city and the start of the snippet."""
+    weights: Dict[str, int] = {}
+    title = _title_tokens(job.title)
+    for token in title:
+        weights["t:" + token] = weights.get("t:" + token, 0) + 4
+    for a, b in zip(title, title[1:]):
+        weights[f"b:{a} {b}"] = weights.get(f"b:{a} {b}", 0) + 2
+    for token in _company_tokens(job.company):
+        weights["c:" + token] = weights.get("c:" + token, 0) + 4
+    # Light weight: a mirror that omits the location stays close, while Deduplicator
+    # never merges two postings whose cities differ
+    city = city_key(job.location)
+    if city:
+        weights["l:" + city] = 1
+    for token in tokenize(job.description)[:SNIPPET_TOKENS]:
+        weights["d:" + token] = weights.get("d:" + token, 0) + 1
+
+    vector = [0] * SIMHASH_BITS
+    for feature, weight in weights.items():
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            vector[bit] += weight if (h >> bit) & 1 else -weight
+
+    fingerprint = 0
+    for bit, value in enumerate(vector):
+        if value > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    width = SIMHASH_BITS // LSH_BANDS
+    mask = (1 << width) - 1
+    return [(band, (fingerprint >> (band * width)) & mask) for band in range(LSH_BANDS)]
+
+
+def host_label(url: Optional[str]) -> Optional[str]:
+    """Job board name for a posting URL, or None for other hosts."""
+    host = urlsplit(url or "").netloc.lower()
+    for domain, label in _HOST_SOURCES.items():
+        if host == domain or host.endswith("." + domain):
+            return label
+    return None
+
+
+def source_label(job: Job) -> str:
+    return host_label(job.url) or job.source
+
+
+class Deduplicator:
+    """
+    Incremental near-duplicate detector. Each added posting is compared
+    only with earlier postings sharing an LSH band, so a stream of n
+    postings costs near-linear time. Postings in different cities are
+    never merged (the same title at the same company elsewhere is another
+    opening); a posting without a location can match any city.
+    """
+
+    def __init__(self):
+        self.jobs: List[Job] = []
+        self.links: List[List[JobLink]] = []
+        self._fingerprints: List[int] = []
+        self._cities: List[str] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        self._seen_urls: Dict[str, int] = {}
+
+    def add(self, job: Job) -> Optional[int]:
+        """
+        Register a posting. Returns the position of the earlier posting it
+        duplicates (recording it as a mirror link), or None if it is new.
+        """
+        match = self._seen_urls.get(job.url)
+        if match is not None:
+            return match
+
+        fingerprint = simhash(job)
+        city = city_key(job.location)
+        for key in _bands(fingerprint):
+            for candidate in self._buckets.get(key, ()):
+                if city and self._cities[candidate] and city != self._cities[candidate]:
+                    continue
+                if bin(fingerprint ^ self._fingerprints[candidate]).count("1") <= MAX_DISTANCE:
+                    self.links[candidate].append(JobLink(source=source_label(job), url=job.url))
+                    self._seen_urls[job.url] = candidate
+                    return candidate
+
+        position = len(self.jobs)
+        self.jobs.append(job)
+        self._fingerprints.append(fingerprint)
+        self._cities.append(city)
+        self.links.append([JobLink(source=source_label(job), url=job.url)])
+        self._seen_urls[job.url] = position
+        for key in _bands(fingerprint):
+            self._buckets.setdefault(key, []).append(position)
+        return None
+
+    def merged_jobs(self) -> List[Job]:
+        """Kept postings, with `links` filled in wherever mirrors were merged."""
+        return [
+            job.copy(update={"links": links}) if len(links) > 1 else job
+            for job, links in zip(self.jobs, self.links)
+        ]
+
+
+def dedupe_jobs(jobs: List[Job]) -> List[Job]:
+    """
+    Collapse near-duplicate postings (the same job mirrored on several
+    boards) into the first, best-ranked one, recording every mirror in
+    `links`.
+    """
+    if len(jobs) < 2:
+        return jobs
+
+    deduplicator = Deduplicator()
+    for job in jobs:
+        deduplicator.add(job)
+    merged = len(jobs) - len(deduplicator.jobs)
+    if merged:
+        print(f"DEBUG: Merged {merged} near-duplicate postings")
+    return deduplicator.merged_jobs()
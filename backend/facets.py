@@ -0,0 +1,227 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional
+
+from company_directory import directory, normalize
+from dedup import host_label
+from schemas import JobSearchRequest
+
+# Structured attributes every job is tagged with, in display order
+FACETS = ("source", "experience", "company_size", "work_mode", "location")
+UNKNOWN = "Unknown"
+# Facets only known for some jobs (company size needs a directory entry or a
+# "startup" mention): Unknown does not exclude a job when filtering on them
+PARTIAL_FACETS = ("company_size",)
+
+_EXPERIENCE_MARKERS = [
+    # Checked in order against the title; the first band with a marker wins
+    ("Internship", {"intern", "internship", "trainee", "apprentice"}),
+    ("Executive", {"director", "vp", "vice", "head", "chief", "cto", "ceo", "cio"}),
+    ("Lead", {"lead", "principal", "staff", "architect"}),
+    ("Senior", {"senior", "sr"}),
+    ("Fresher", {"fresher", "freshers", "graduate", "junior", "jr", "entry"}),
+    ("Associate", {"associate", "mid"}),
+]
+_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years|yrs)")
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def experience_band(title: str, description: Optional[str]) -> str:
+    """Experience band (the frontend's EXPERIENCE_LEVELS) from title words, then years asked for."""
+    words = set(_WORD_RE.findall((title or "").lower()))
+    for band, markers in _EXPERIENCE_MARKERS:
+        if words & markers:
+            return band
+    match = _YEARS_RE.search((description or "").lower())
+    if match:
+        years = int(match.group(1))
+        if years <= 1:
+            return "Fresher"
+        if years <= 4:
+            return "Associate"
+        return "Senior" if years <= 8 else "Lead"
+    return "Associate"
+
+
+def work_mode(title: str, description: Optional[str], location: Optional[str]) -> str:
+    text = f"{title} {location or ''} {description or ''}".lower()
+    if "hybrid" in text:
+        return "Hybrid"
+    if "remote" in text or "work from home" in text or "wfh" in text:
+        return "Remote"
+    return "Onsite"
+
+
+def platform(url: Optional[str], source: Optional[str]) -> str:
+    """Job board label (the frontend's SEARCH_PLATFORMS) for a posting."""
+    label = host_label(url) or source or ""
+    if "google" in label.lower():
+        return "Google"
+    return label or UNKNOWN
+
+
+def employer(company: Optional[str], board: Optional[str]) -> Optional[str]:
+    """The posting's company, or None when it is only the job board's name ("Engineer - LinkedIn" on LinkedIn)."""
+    if company and board and normalize(company) == normalize(board):
+        return None
+    return company
+
+
+def company_size(company: Optional[str], description: Optional[str]) -> str:
+    """Size from the company directory, else Startup if the posting says so."""
+    known = directory.resolve(company)
+    if known is not None:
+        return known.size
+    if "startup" in (description or "").lower():
+        return "Startup"
+    return UNKNOWN
+
+
+def city(location: Optional[str]) -> str:
+    name = (location or "").split(",")[0].strip()
+    return name.title() if name else UNKNOWN
+
+
+def job_attributes(title: str, company: str, description: Optional[str], location: Optional[str], url: Optional[str], source: Optional[str]) -> Dict[str, str]:
+    return {
+        "source": platform(url, source),
+        "experience": experience_band(title, description),
+        "company_size": company_size(employer(company, host_label(url) or source), description),
+        "work_mode": work_mode(title, description, location),
+        "location": city(location),
+    }
+
+
+def filters_for(platforms: List[str] = None, experience_level: List[str] = None, company_size: List[str] = None) -> Dict[str, List[str]]:
+    """Structured search filters by facet (unset filters are omitted)."""
+    filters = {}
+    if platforms and "All" not in platforms:
+        filters["source"] = list(platforms)
+    if experience_level:
+        filters["experience"] = list(experience_level)
+    if company_size:
+        filters["company_size"] = list(company_size)
+    return filters
+
+
+def request_filters(request: JobSearchRequest) -> Dict[str, List[str]]:
+    return filters_for(request.platforms, request.experience_level, request.company_size)
+
+
+def matches(attributes: Dict[str, str], filters: Dict[str, List[str]], strict: bool = True) -> bool:
+    """
+    Check one job's attributes against filters. With strict=False an
+    attribute that could not be determined (Unknown) does not exclude the
+    job, for sources whose results were already filtered upstream.
+    """
+    for facet, values in filters.items():
+        value = attributes.get(facet, UNKNOWN)
+        if value in values or (not strict and value == UNKNOWN):
+            continue
+        return False
+    return True
+
+
+def bitmap_of(slots: Iterable[int]) -> int:
+    """Bitmap with the given positions set, built in one pass."""
+    slots = list(slots)
+    if not slots:
+        return 0
+    buffer = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        buffer[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def slots_of(bitmap: int) -> List[int]:
+    """Positions set in a bitmap, ascending."""
+    slots = []
+    for i, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+        if byte:
+            base = i << 3
+            slots.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return slots
+
+
+def membership(bitmap: int) -> Callable[[int], bool]:
+    """O(1) membership test for many lookups against one bitmap."""
+    flags = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    size = len(flags)
+    return lambda slot: (slot >> 3) < size and bool(flags[slot >> 3] >> (slot & 7) & 1)
+
+
+class BitmapIndex:
+    """
+    One bitmap per (facet, value) over integer document slots.
+
+    A filter is an OR of the selected values' bitmaps per facet, ANDed
+    across facets, so it is exact and costs a handful of big-integer
+    operations whatever the corpus size. Facet counts are popcounts of
+    each value's bitmap ANDed with the candidates. New slots are buffered
+    and folded into the bitmaps in bulk on the next read.
+    """
+
+    def __init__(self):
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._pending: Dict[tuple, List[int]] = {}
+        self._attributes: Dict[int, Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._attributes)
+
+    def add(self, slot: int, attributes: Dict[str, str]):
+        if slot in self._attributes:
+            self.remove(slot)
+        self._attributes[slot] = attributes
+        for facet in FACETS:
+            self._pending.setdefault((facet, attributes.get(facet, UNKNOWN)), []).append(slot)
+
+    def remove(self, slot: int):
+        attributes = self._attributes.pop(slot, None)
+        if attributes is None:
+            return
+        self._flush()
+        mask = ~(1 << slot)
+        for facet in FACETS:
+            value = attributes.get(facet, UNKNOWN)
+            self._bitmaps[facet][value] &= mask
+
+    def _flush(self):
+        for (facet, value), slots in self._pending.items():
+            self._bitmaps[facet][value] = self._bitmaps[facet].get(value, 0) | bitmap_of(slots)
+        self._pending.clear()
+
+    def filter(self, filters: Dict[str, List[str]], skip: Optional[str] = None) -> Optional[int]:
+        """
+        Bitmap of slots passing every filter (except facet `skip`); None
+        when nothing filters. Unknown passes filters on PARTIAL_FACETS.
+        """
+        self._flush()
+        result = None
+        for facet, values in filters.items():
+            if facet == skip:
+                continue
+            bitmaps = self._bitmaps.get(facet, {})
+            selected = bitmaps.get(UNKNOWN, 0) if facet in PARTIAL_FACETS else 0
+            for value in values:
+                selected |= bitmaps.get(value, 0)
+            result = selected if result is None else result & selected
+        return result
+
+    def counts(self, candidates: int, filters: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+        """
+        Per facet, how many candidates have each value. Each facet is
+        counted with the other facets' filters applied but not its own,
+        so selecting one platform still shows the counts of the others.
+        """
+        self._flush()
+        counts = {}
+        for facet in FACETS:
+            allowed = self.filter(filters, skip=facet)
+            base = candidates if allowed is None else candidates & allowed
+            values = {}
+            for value, bitmap in self._bitmaps[facet].items():
+                count = (bitmap & base).bit_count()
+                if count:
+                    values[value] = count
+            counts[facet] = dict(sorted(values.items(), key=lambda item: item[1], reverse=True))
+        return counts
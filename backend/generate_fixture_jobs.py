@@ -0,0 +1,52 @@
+"""
+Generate a large synthetic job catalog for offline mode and load tests.
+
+Usage:
+    python generate_fixture_jobs.py 100000 data/load_test_jobs.ndjson
+    JOB_FIXTURE_PATH=data/load_test_jobs.ndjson uvicorn main:app
+"""
+import json
+import random
+import sys
+from urllib.parse import quote_plus
+
+from suggestions import POPULAR_JOB_TITLES, POPULAR_LOCATIONS, POPULAR_SKILLS, POPULAR_COMPANIES
+
+SENIORITY = ["", "Junior ", "Senior ", "Lead ", "Principal "]
+SOURCES = {
+    "LinkedIn": "https://www.linkedin.com/jobs/view/{id}",
+    "Indeed": "https://www.indeed.com/viewjob?jk={id}",
+    "Glassdoor": "https://www.glassdoor.com/job-listing/{id}",
+    "Naukri": "https://www.naukri.com/job-listings-{id}",
+}
+
+
+def generate(count: int, path: str, seed: int = 42):
+    rng = random.Random(seed)
+    sources = list(SOURCES)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            title = rng.choice(SENIORITY) + rng.choice(POPULAR_JOB_TITLES)
+            company = rng.choice(POPULAR_COMPANIES)
+            skills = rng.sample(POPULAR_SKILLS, 4)
+            years = rng.randint(0, 10)
+            source = rng.choice(sources)
+            record = {
+                "title": title,
+                "company": company,
+                "location": rng.choice(POPULAR_LOCATIONS),
+                "description": (
+                    f"{company} is hiring a {title}. Work with {', '.join(skills[:3])} and {skills[3]}. "
+                    f"{years}+ years of experience preferred."
+                ),
+                "url": SOURCES[source].format(id=f"{i}-{quote_plus(title.lower())}"),
+                "source": source,
+            }
+            f.write(json.dumps(record) + "\n")
+    print(f"Wrote {count} jobs to {path}")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = sys.argv[2] if len(sys.argv) > 2 else "data/load_test_jobs.ndjson"
+    generate(count, path)
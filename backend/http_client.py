@@ -0,0 +1,194 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from scrapers.throttle import CircuitBreaker
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))
+HTTP_DEFAULT_DEADLINE = float(os.getenv("HTTP_DEFAULT_DEADLINE", "10.0"))  # Whole call, retries included
+HTTP_BREAKER_FAILURES = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_RESET_SECONDS = float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+HTTP_RETRY_BASE_SECONDS = 0.2
+HTTP_RETRY_MAX_SECONDS = 2.0
+LATENCY_SAMPLES = 256  # Recent calls kept per host for percentiles
+
+# Statuses worth another attempt; anything else is the caller's answer
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised without calling out when a host's circuit breaker is open."""
+
+
+class HostStats:
+    def __init__(self):
+        self.calls = 0
+        self.ok = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.rejected = 0
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+
+    def summary(self) -> dict:
+        samples = sorted(self.latencies_ms)
+        return {
+            "calls": self.calls,
+            "ok": self.ok,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "avg_ms": round(sum(samples) / len(samples), 1) if samples else 0.0,
+            "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 1) if samples else 0.0,
+        }
+
+
+class OutboundClient:
+    """
+    The one way the backend talks to external services.
+
+    Every call goes through a single pooled httpx client (keep-alive,
+    bounded connections), is bounded by an overall deadline, retries
+    transport errors and 429/5xx with jittered exponential backoff, and is
+    guarded by a circuit breaker per host. Per-host call counts, errors
+    and latencies are kept for /http-stats.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats: Dict[str, HostStats] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, recreating it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(HTTP_DEFAULT_DEADLINE, connect=HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+                transport=self._transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def close(self):
+        """Close the pooled client (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(HTTP_BREAKER_FAILURES, HTTP_BREAKER_RESET_SECONDS)
+        return breaker
+
+    def configure_host(self, host: str, failure_threshold: int, reset_timeout: float) -> CircuitBreaker:
+        """Give one host its own breaker thresholds (e.g. from that integration's settings)."""
+        self.breakers[host] = CircuitBreaker(failure_threshold, reset_timeout)
+        return self.breakers[host]
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        # Full jitter so callers that failed together do not retry together
+        return random.uniform(0, min(HTTP_RETRY_MAX_SECONDS, HTTP_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    async def request(self, method: str, url: str, deadline: float = HTTP_DEFAULT_DEADLINE, retries: int = 2, **kwargs) -> httpx.Response:
+        """
+        Send a request, retrying up to `retries` times within `deadline`
+        seconds in total. Returns the last response (the caller decides
+        what a 4xx means); raises the last transport error, httpx.TimeoutException
+        when the deadline runs out, or CircuitOpenError.
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker_for(host)
+        stats = self.stats.setdefault(host, HostStats())
+        if not breaker.allow():
+            stats.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}")
+        probe = breaker.state == CircuitBreaker.HALF_OPEN
+
+        try:
+            return await self._send(breaker, stats, method, url, host, deadline, retries, **kwargs)
+        except BaseException:
+            # Cancelled or failed before recording an outcome: do not hold the half-open probe
+            if probe and breaker.state == CircuitBreaker.HALF_OPEN:
+                breaker.release()
+            raise
+
+    async def _send(self, breaker: CircuitBreaker, stats: HostStats, method: str, url: str, host: str,
+                    deadline: float, retries: int, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        expires = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            remaining = expires - time.monotonic()
+            started = time.perf_counter()
+            response = None
+            error = None
+            stats.calls += 1
+            try:
+                response = await asyncio.wait_for(client.request(method, url, **kwargs), timeout=max(remaining, 0.001))
+            except asyncio.TimeoutError:
+                error = httpx.TimeoutException(f"{method} {host} exceeded its {deadline}s deadline")
+                stats.timeouts += 1
+            except httpx.TimeoutException as e:
+                error = e
+                stats.timeouts += 1
+            except httpx.TransportError as e:
+                error = e
+                stats.errors += 1
+            stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                stats.ok += 1
+                breaker.record_success()
+                return response
+            if response is not None:
+                stats.errors += 1
+
+            delay = self._backoff(attempt, response)
+            if attempt >= retries or time.monotonic() + delay >= expires:
+                breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            stats.retries += 1
+            print(f"DEBUG: Retrying {method} {host} in {delay:.2f}s (attempt {attempt + 1})")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> dict:
+        return {
+            host: {**stats.summary(), "circuit": self.breaker_for(host).stats()}
+            for host, stats in self.stats.items()
+        }
+
+
+# Process-wide outbound client shared by every external integration
+client = OutboundClient()
+
+
+async def close_client():
+    await client.close()
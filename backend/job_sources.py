@@ -0,0 +1,349 @@
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from fastapi.concurrency import run_in_threadpool
+
+import facets
+import job_store
+from dedup import Deduplicator, dedupe_jobs
+from schemas import Job, JobSearchRequest
+from scrapers import google_search
+from scrapers.google_search import search_jobs_google, _get_mock_jobs, _mock_facet_counts, _mock_profile_matches
+
+
+class JobSource:
+    """
+    One place jobs can come from. Subclasses set `name`, a latency budget
+    in seconds, and implement `search`. `local` sources are cheap (no quota,
+    no network) and are consulted before any remote source.
+
+    New platform adapters only need to subclass this and be added to
+    `build_default_sources` (or passed to `SearchAggregator` directly).
+    """
+
+    name = "source"
+    timeout = 2.0
+    local = False
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    async def search(self, request: JobSearchRequest) -> List[Job]:
+        raise NotImplementedError
+
+    async def facet_counts(self, request: JobSearchRequest) -> Optional[Tuple[int, Dict[str, Dict[str, int]]]]:
+        """(total, facet -> value -> count) over everything matching, for sources that can count cheaply."""
+        return None
+
+    async def match_profile(self, terms: Dict[str, float], location: str, limit: int) -> Optional[List[Tuple[Job, float]]]:
+        """(job, similarity) pairs closest to a profile, for sources with a local corpus."""
+        return None
+
+
+class GoogleCSESource(JobSource):
+    name = "google"
+    timeout = float(os.getenv("SOURCE_TIMEOUT_GOOGLE", "3.0"))
+
+    @property
+    def enabled(self) -> bool:
+        return google_search.is_configured()
+
+    async def search(self, request: JobSearchRequest) -> List[Job]:
+        jobs = await search_jobs_google(
+            request.query,
+            request.location,
+            request.start,
+            experience_level=request.experience_level,
+            platforms=request.platforms,
+            limit=request.limit,
+            fallback=False
+        )
+        # Platform and experience are already part of the Google query; company
+        # size is not searchable text, so it is checked on the results instead
+        filters = facets.filters_for(company_size=request.company_size)
+        if not filters:
+            return jobs
+        return [
+            job for job in jobs
+            if facets.matches(facets.job_attributes(job.title, job.company, job.description, job.location, job.url, job.source), filters, strict=False)
+        ]
+
+
+class LocalStoreSource(JobSource):
+    name = "local"
+    timeout = float(os.getenv("SOURCE_TIMEOUT_LOCAL", "0.5"))
+    local = True
+
+    async def search(self, request: JobSearchRequest) -> List[Job]:
+        return await run_in_threadpool(
+            job_store.search_local,
+            request.query,
+            request.location,
+            request.start,
+            request.limit,
+            facets.request_filters(request)
+        )
+
+    async def facet_counts(self, request: JobSearchRequest):
+        return await run_in_threadpool(job_store.facet_counts, request.query, request.location, facets.request_filters(request))
+
+    async def match_profile(self, terms, location, limit):
+        return await run_in_threadpool(job_store.match_profile, terms, location, limit)
+
+
+class FixtureSource(JobSource):
+    """The offline fixture catalog. Only a primary source when Google is not configured."""
+
+    name = "fixture"
+    timeout = float(os.getenv("SOURCE_TIMEOUT_FIXTURE", "0.5"))
+    local = True
+
+    @property
+    def enabled(self) -> bool:
+        return not google_search.is_configured()
+
+    async def search(self, request: JobSearchRequest) -> List[Job]:
+        return await run_in_threadpool(
+            _get_mock_jobs,
+            request.query,
+            request.location,
+            request.start,
+            request.experience_level,
+            request.platforms,
+            request.limit,
+            request.company_size
+        )
+
+    async def facet_counts(self, request: JobSearchRequest):
+        return await run_in_threadpool(_mock_facet_counts, request.query, facets.request_filters(request))
+
+    async def match_profile(self, terms, location, limit):
+        return await run_in_threadpool(_mock_profile_matches, terms, location, limit)
+
+
+class SourceResult:
+    def __init__(self, source: str, status: str, elapsed_ms: float, jobs: List[Job] = None, error: str = None):
+        self.source = source
+        self.status = status  # ok | timeout | error | skipped
+        self.elapsed_ms = elapsed_ms
+        self.jobs = jobs or []
+        self.error = error
+
+    def summary(self) -> dict:
+        summary = {"status": self.status, "elapsed_ms": round(self.elapsed_ms, 1), "count": len(self.jobs)}
+        if self.error:
+            summary["error"] = self.error
+        return summary
+
+
+class SearchResult:
+    def __init__(self, jobs: List[Job], sources: Dict[str, SourceResult], elapsed_ms: float):
+        self.jobs = jobs
+        self.sources = sources
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def degraded(self) -> bool:
+        """True when a source that was asked failed or missed its deadline."""
+        return any(result.status in ("timeout", "error") for result in self.sources.values())
+
+    @property
+    def raw_count(self) -> int:
+        """Most results any one source returned before merging and dedupe; below the limit, no source has more."""
+        return max((len(result.jobs) for result in self.sources.values()), default=0)
+
+    def summary(self) -> dict:
+        return {
+            "total": len(self.jobs),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "sources": {name: result.summary() for name, result in self.sources.items()},
+        }
+
+
+class SearchAggregator:
+    """
+    Fan a search out to the enabled sources in two phases, each source
+    bounded by its own deadline, and merge whatever arrived in time.
+
+    The local sources are asked first, concurrently with each other; the
+    remote sources are then asked, concurrently with each other, only when
+    the local ones cannot fill the page, so a page the local store can
+    answer spends no Custom Search quota. A search therefore takes at most
+    the slowest local budget plus the slowest remote budget. A source that
+    misses its deadline is dropped from this response; its in-flight call
+    is not cancelled upstream (coalesced fetches keep running and still
+    reach the store).
+    """
+
+    def __init__(self, sources: List[JobSource], fallback: Optional[JobSource] = None):
+        self.sources = sources
+        self.fallback = fallback
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    async def _run(self, source: JobSource, request: JobSearchRequest) -> SourceResult:
+        started = time.perf_counter()
+        try:
+            jobs = await asyncio.wait_for(source.search(request), timeout=source.timeout)
+            result = SourceResult(source.name, "ok", 0, [job.copy(update={"provider": source.name}) for job in jobs])
+        except asyncio.TimeoutError:
+            result = SourceResult(source.name, "timeout", 0)
+            print(f"Source '{source.name}' missed its {source.timeout}s budget")
+        except Exception as e:
+            result = SourceResult(source.name, "error", 0, error=str(e))
+            print(f"Source '{source.name}' failed: {e}")
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        self._record(result)
+        return result
+
+    def _record(self, result: SourceResult):
+        stats = self.stats.setdefault(result.source, {"calls": 0, "ok": 0, "timeout": 0, "error": 0, "total_ms": 0.0})
+        stats["calls"] += 1
+        stats[result.status] += 1
+        stats["total_ms"] += result.elapsed_ms
+
+    async def _gather(self, sources: List[JobSource], request: JobSearchRequest) -> List[SourceResult]:
+        return list(await asyncio.gather(*(self._run(source, request) for source in sources)))
+
+    @staticmethod
+    def merge(results: List[SourceResult], limit: int) -> List[Job]:
+        """Interleave source rankings (in source order), dropping repeats and near-duplicates."""
+        merged = []
+        seen = set()
+        lists = [result.jobs for result in results if result.jobs]
+        for rank in range(max((len(jobs) for jobs in lists), default=0)):
+            for jobs in lists:
+                if rank < len(jobs):
+                    job = jobs[rank]
+                    key = job.id or job.url
+                    if key not in seen:
+                        seen.add(key)
+                        merged.append(job)
+        return dedupe_jobs(merged)[:limit]
+
+    async def search(self, request: JobSearchRequest) -> SearchResult:
+        started = time.perf_counter()
+        enabled = [source for source in self.sources if source.enabled]
+        local = [source for source in enabled if source.local]
+        remote = [source for source in enabled if not source.local]
+
+        results = await self._gather(local, request)
+        jobs = self.merge(results, request.limit)
+        if remote and len(jobs) < request.limit:
+            results += await self._gather(remote, request)
+            jobs = self.merge(results, request.limit)
+        else:
+            for source in remote:
+                results.append(SourceResult(source.name, "skipped", 0))
+
+        if not jobs and self.fallback is not None and self.fallback.name not in {source.name for source in enabled}:
+            fallback = await self._run(self.fallback, request)
+            results.append(fallback)
+            jobs = fallback.jobs[:request.limit]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return SearchResult(jobs, {result.source: result for result in results}, elapsed_ms)
+
+    async def stream(self, request: JobSearchRequest) -> AsyncIterator[Union[SourceResult, SearchResult]]:
+        """
+        Progressive variant of `search`: yields one SourceResult per source
+        as soon as it finishes (holding only jobs not already emitted by a
+        faster source), then a final SearchResult with the merged page and
+        per-source timings.
+        """
+        started = time.perf_counter()
+        enabled = [source for source in self.sources if source.enabled]
+        local = [source for source in enabled if source.local]
+        remote = [source for source in enabled if not source.local]
+        deduplicator = Deduplicator()
+        results: List[SourceResult] = []
+
+        def emit(result: SourceResult) -> SourceResult:
+            results.append(result)
+            fresh = []
+            for job in result.jobs:
+                if len(deduplicator.jobs) >= request.limit:
+                    break
+                if deduplicator.add(job) is None:
+                    fresh.append(job)
+            return SourceResult(result.source, result.status, result.elapsed_ms, fresh, result.error)
+
+        for phase in (local, remote):
+            if phase is remote and len(deduplicator.jobs) >= request.limit:
+                results.extend(SourceResult(source.name, "skipped", 0) for source in remote)
+                continue
+            tasks = [asyncio.ensure_future(self._run(source, request)) for source in phase]
+            for next_done in asyncio.as_completed(tasks):
+                yield emit(await next_done)
+
+        if not deduplicator.jobs and self.fallback is not None and self.fallback.name not in {source.name for source in enabled}:
+            yield emit(await self._run(self.fallback, request))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        yield SearchResult(deduplicator.merged_jobs(), {result.source: result for result in results}, elapsed_ms)
+
+    async def facet_counts(self, request: JobSearchRequest) -> dict:
+        """
+        Facet counts summed over the enabled sources that can count (the
+        local store and the fixture catalog); remote sources only return
+        a page, so they cannot say how many results each filter value has.
+        """
+        sources = [source for source in self.sources if source.enabled]
+        results = await asyncio.gather(*(source.facet_counts(request) for source in sources), return_exceptions=True)
+        total = 0
+        counts: Dict[str, Dict[str, int]] = {facet: {} for facet in facets.FACETS}
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                print(f"Facet counts from '{source.name}' failed: {result}")
+                continue
+            if result is None:
+                continue
+            source_total, source_counts = result
+            total += source_total
+            for facet, values in source_counts.items():
+                for value, count in values.items():
+                    counts[facet][value] = counts[facet].get(value, 0) + count
+        return {
+            "total": total,
+            "facets": {facet: dict(sorted(values.items(), key=lambda item: item[1], reverse=True)) for facet, values in counts.items()},
+        }
+
+    async def match_profile(self, terms: Dict[str, float], location: str = "", limit: int = 20) -> List[Job]:
+        """
+        Jobs most similar to a profile across the enabled sources with a
+        local corpus, best first, each with its cosine in `similarity`.
+        Never spends Custom Search quota.
+        """
+        sources = [source for source in self.sources if source.enabled]
+        results = await asyncio.gather(*(source.match_profile(terms, location, limit) for source in sources), return_exceptions=True)
+        scored = []
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                print(f"Profile matching in '{source.name}' failed: {result}")
+                continue
+            for job, score in result or []:
+                scored.append(job.copy(update={"provider": source.name, "similarity": round(score, 4)}))
+        scored.sort(key=lambda job: job.similarity, reverse=True)
+        return dedupe_jobs(scored)[:limit]
+
+    def get_stats(self) -> dict:
+        return {
+            name: {
+                "calls": int(stats["calls"]),
+                "ok": int(stats["ok"]),
+                "timeouts": int(stats["timeout"]),
+                "errors": int(stats["error"]),
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 1) if stats["calls"] else 0.0,
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+def build_default_sources() -> List[JobSource]:
+    return [LocalStoreSource(), GoogleCSESource(), FixtureSource()]
+
+
+# Process-wide aggregator used by POST /search
+aggregator = SearchAggregator(build_default_sources(), fallback=FixtureSource())
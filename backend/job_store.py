@@ -0,0 +1,348 @@
+import hashlib
+import heapq
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy.orm import Session
+
+import facets
+import job_vectors
+import models
+import percolator
+import schemas
+from database import SessionLocal, engine
+from search_index import InvertedIndex, tokenize
+
+# Stored jobs older than this are not used to answer searches
+JOB_STORE_MAX_AGE_HOURS = int(os.getenv("JOB_STORE_MAX_AGE_HOURS", "72"))
+SIMILAR_JOBS_NEIGHBORS = int(os.getenv("SIMILAR_JOBS_NEIGHBORS", "10"))  # Neighbors kept per stored job
+# Re-read rows seen this long before the last sync, for writes that committed after it
+JOB_STORE_SYNC_OVERLAP_SECONDS = int(os.getenv("JOB_STORE_SYNC_OVERLAP_SECONDS", "60"))
+
+# Query parameters that only track the click and never identify the posting
+_TRACKING_PARAMS = {"trk", "trackingid", "refid", "ref", "src", "from", "gclid", "fbclid"}
+
+# BM25 index over the stored corpus, shared by all requests in this worker.
+# Rows written or refreshed by other workers are picked up by last_seen_at on
+# the next search, and jobs not seen for JOB_STORE_MAX_AGE_HOURS are evicted.
+_index = InvertedIndex()
+_index_meta: Dict[str, Tuple[str, str, datetime]] = {}  # url_hash -> (location, url, last_seen_at)
+_expiry: List[Tuple[datetime, str]] = []  # heap of (last_seen_at, url_hash), may hold superseded entries
+_synced_at: Optional[datetime] = None  # Newest last_seen_at read from the database
+_index_lock = threading.Lock()
+# Structured attributes (platform, experience band, ...) as bitmaps over per-job slots
+_facets = facets.BitmapIndex()
+_facet_slot: Dict[str, int] = {}  # url_hash -> slot
+_slot_keys: List[Optional[str]] = []  # slot -> url_hash, None once evicted
+_free_slots: List[int] = []  # Slots of evicted jobs, reused before new ones so bitmaps and rows stay bounded
+# TF-IDF rows over the same slots, for profile matching, and each job's nearest neighbors
+_vectors = job_vectors.TfidfMatrix()
+_neighbors = job_vectors.NeighborGraph(k=SIMILAR_JOBS_NEIGHBORS)
+_unlinked: List[int] = []  # Slots indexed but not yet added to the neighbor graph
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a job URL so mirrors of one link hash the same."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, urlencode(query), ""))
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def _to_schema(row: models.Job) -> schemas.Job:
+    return schemas.Job(
+        id=row.url_hash,
+        title=row.title,
+        company=row.company,
+        location=row.location or "",
+        description=row.description,
+        url=row.url,
+        source=row.source,
+        posted_date=row.posted_date,
+        salary=row.salary,
+    )
+
+
+def load_jobs(keys: List[str], db: Session) -> List[schemas.Job]:
+    """Stored jobs by url_hash, in the order given (unknown keys are skipped)."""
+    if not keys:
+        return []
+    rows = db.query(models.Job).filter(models.Job.url_hash.in_(keys)).all()
+    by_hash = {row.url_hash: row for row in rows}
+    return [_to_schema(by_hash[key]) for key in keys if key in by_hash]
+
+
+def _upsert_statement(rows: List[dict]):
+    """Single INSERT ... ON CONFLICT (url_hash) DO UPDATE for the whole batch."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(models.Job).values(rows)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[models.Job.url_hash],
+        set_={
+            "url": excluded.url,
+            "title": excluded.title,
+            "company": excluded.company,
+            "location": excluded.location,
+            "description": excluded.description,
+            "source": excluded.source,
+            "posted_date": excluded.posted_date,
+            "salary": excluded.salary,
+            "last_seen_at": excluded.last_seen_at,
+        },
+    )
+
+
+def _index_job(key: str, title: str, company: str, description: Optional[str], location: Optional[str], url: str, source: Optional[str], last_seen_at: datetime):
+    _index.add(key, {"title": title, "company": company, "description": description})
+    _index_meta[key] = ((location or "").lower(), (url or "").lower(), last_seen_at)
+    slot = _facet_slot.get(key)
+    if slot is None:
+        if _free_slots:
+            slot = _free_slots.pop()
+            _slot_keys[slot] = key
+        else:
+            slot = len(_slot_keys)
+            _slot_keys.append(key)
+        _facet_slot[key] = slot
+    _facets.add(slot, facets.job_attributes(title, company, description, location, url, source))
+    _vectors.add(slot, job_vectors.job_terms(title, description))
+    _unlinked.append(slot)
+    heapq.heappush(_expiry, (last_seen_at, key))
+
+
+def _evict_expired(cutoff: datetime):
+    """Drop jobs last seen before `cutoff` from every in-memory structure (caller holds _index_lock)."""
+    while _expiry and _expiry[0][0] < cutoff:
+        last_seen_at, key = heapq.heappop(_expiry)
+        meta = _index_meta.get(key)
+        if meta is None or meta[2] != last_seen_at:
+            continue  # Evicted already, or seen again since
+        del _index_meta[key]
+        _index.remove(key)
+        slot = _facet_slot.pop(key)
+        _facets.remove(slot)
+        _vectors.remove(slot)
+        _neighbors.remove(slot)
+        _slot_keys[slot] = None
+        _free_slots.append(slot)
+
+
+def _link_neighbors():
+    """Add newly indexed jobs to the neighbor graph (caller holds _index_lock)."""
+    if _unlinked:
+        slots = list(dict.fromkeys(_unlinked))
+        _unlinked.clear()
+        _neighbors.update(_vectors, slots)
+
+
+def _sync_index(db: Session):
+    """Index rows added or refreshed since the last sync (by this or any other worker) and evict expired ones."""
+    global _synced_at
+    cutoff = datetime.utcnow() - timedelta(hours=JOB_STORE_MAX_AGE_HOURS)
+    since = cutoff if _synced_at is None else max(cutoff, _synced_at - timedelta(seconds=JOB_STORE_SYNC_OVERLAP_SECONDS))
+    rows = (
+        db.query(
+            models.Job.url_hash, models.Job.title, models.Job.company, models.Job.description,
+            models.Job.location, models.Job.url, models.Job.source, models.Job.last_seen_at,
+        )
+        .filter(models.Job.last_seen_at >= since)
+        .order_by(models.Job.last_seen_at)
+        .all()
+    )
+    for row in rows:
+        meta = _index_meta.get(row.url_hash)
+        if meta is None or meta[2] < row.last_seen_at:
+            _index_job(row.url_hash, row.title, row.company, row.description, row.location, row.url, row.source, row.last_seen_at)
+        _synced_at = row.last_seen_at if _synced_at is None else max(_synced_at, row.last_seen_at)
+    _evict_expired(cutoff)
+
+
+def ingest_jobs(jobs: List[schemas.Job], db: Optional[Session] = None) -> int:
+    """Bulk upsert a result page into the local store. Returns the number of distinct jobs written."""
+    now = datetime.utcnow()
+    rows = {}
+    for job in jobs:
+        if not job.url:
+            continue
+        key = job.id or url_hash(job.url)
+        # Later duplicates in the same page win, like they would row by row
+        rows[key] = {
+            "url_hash": key,
+            "url": job.url,
+            "title": job.title,
+            "company": job.company,
+            "location": job.location,
+            "description": job.description,
+            "source": job.source,
+            "posted_date": job.posted_date,
+            "salary": job.salary,
+            "first_seen_at": now,
+            "last_seen_at": now,
+        }
+    if not rows:
+        return 0
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        # first_seen_at is only written on insert, so it tells new jobs from refreshed ones
+        written = db.execute(
+            _upsert_statement(list(rows.values())).returning(models.Job.url_hash, models.Job.first_seen_at)
+        ).all()
+        db.commit()
+
+        with _index_lock:
+            for row in rows.values():
+                _index_job(row["url_hash"], row["title"], row["company"], row["description"], row["location"], row["url"], row["source"], now)
+            _link_neighbors()
+
+        # Job alerts: match jobs never seen before against users' saved searches
+        new_jobs = [rows[key] for key, first_seen_at in written if first_seen_at == now]
+        if new_jobs:
+            try:
+                matched = percolator.percolate(new_jobs, db)
+                if matched:
+                    print(f"DEBUG: {matched} saved search matches from {len(new_jobs)} new jobs")
+            except Exception as e:
+                print(f"Saved search matching failed: {e}")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+    return len(rows)
+
+
+def search_local(query: str, location: str = "", start: int = 1, limit: int = 10, filters: Dict[str, List[str]] = None, db: Optional[Session] = None) -> List[schemas.Job]:
+    """
+    Answer a search from recently seen jobs. Every query word must appear in
+    the title, company or description; `filters` (facet -> accepted values,
+    see facets.request_filters) are exact. Results are ranked with BM25.
+    """
+    if not tokenize(query):
+        return []
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=JOB_STORE_MAX_AGE_HOURS)
+        location = (location or "").strip().lower()
+
+        with _index_lock:
+            _sync_index(db)
+            allowed = _facets.filter(filters or {})
+            in_filters = None if allowed is None else facets.membership(allowed)
+
+            def accept(key: str) -> bool:
+                job_location, _, last_seen_at = _index_meta[key]
+                if last_seen_at < cutoff:
+                    return False
+                if location and location not in job_location:
+                    return False
+                return in_filters is None or in_filters(_facet_slot[key])
+
+            offset = max(start, 1) - 1
+            ranked = _index.search(query, limit=offset + limit, accept=accept, match_all=True)
+
+        return load_jobs([key for key, _ in ranked[offset:offset + limit]], db)
+    finally:
+        if own_session:
+            db.close()
+
+
+def facet_counts(query: str, location: str = "", filters: Dict[str, List[str]] = None, db: Optional[Session] = None) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    """(total, per-facet value counts) for the jobs `search_local` would match."""
+    if not tokenize(query):
+        return 0, {}
+
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=JOB_STORE_MAX_AGE_HOURS)
+        location = (location or "").strip().lower()
+        filters = filters or {}
+        with _index_lock:
+            _sync_index(db)
+            slots = []
+            for key in _index.docs_matching(query):
+                job_location, _, last_seen_at = _index_meta[key]
+                if last_seen_at >= cutoff and (not location or location in job_location):
+                    slots.append(_facet_slot[key])
+            candidates = facets.bitmap_of(slots)
+            allowed = _facets.filter(filters)
+            total = (candidates if allowed is None else candidates & allowed).bit_count()
+            return total, _facets.counts(candidates, filters)
+    finally:
+        if own_session:
+            db.close()
+
+
+def match_profile(terms: Dict[str, float], location: str = "", limit: int = 20, db: Optional[Session] = None) -> List[Tuple[schemas.Job, float]]:
+    """Recently seen jobs closest to a profile (job_vectors.profile_terms) by TF-IDF cosine, best first."""
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=JOB_STORE_MAX_AGE_HOURS)
+        location = (location or "").strip().lower()
+
+        def accept(slot: int) -> bool:
+            job_location, _, last_seen_at = _index_meta[_slot_keys[slot]]
+            return last_seen_at >= cutoff and (not location or location in job_location)
+
+        with _index_lock:
+            _sync_index(db)
+            ranked = _vectors.top_k(_vectors.query_vector(terms), limit, accept=accept)
+
+        scores = {_slot_keys[slot]: score for slot, score in ranked}
+        jobs = load_jobs([_slot_keys[slot] for slot, _ in ranked], db)
+        return [(job, scores[job.id]) for job in jobs]
+    finally:
+        if own_session:
+            db.close()
+
+
+def similar_jobs(key: str, limit: int = 10, db: Optional[Session] = None) -> Optional[List[Tuple[schemas.Job, float]]]:
+    """
+    Recently seen jobs most like the stored job `key` (url_hash), best
+    first, from the precomputed neighbor graph. None if `key` is not stored
+    or was last seen too long ago.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=JOB_STORE_MAX_AGE_HOURS)
+        with _index_lock:
+            _sync_index(db)
+            _link_neighbors()
+            slot = _facet_slot.get(key)
+            if slot is None:
+                return None
+            neighbors = [
+                (_slot_keys[neighbor], score) for neighbor, score in _neighbors.neighbors(slot)
+                if _index_meta[_slot_keys[neighbor]][2] >= cutoff
+            ][:limit]
+
+        scores = dict(neighbors)
+        jobs = load_jobs([neighbor for neighbor, _ in neighbors], db)
+        return [(job, scores[job.id]) for job in jobs]
+    finally:
+        if own_session:
+            db.close()
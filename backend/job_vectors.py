@@ -0,0 +1,295 @@
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from search_index import tokenize
+
+FEATURE_BITS = 18  # 262,144 hashed features: collisions are rare at job-posting vocabulary sizes
+DIM = 1 << FEATURE_BITS
+
+# How much each part of a profile counts towards the user's vector
+PROFILE_WEIGHTS = {
+    "skills": 3.0,
+    "job_preferences": 3.0,
+    "experience_role": 2.0,
+    "experience_description": 1.0,
+    "project_technologies": 2.0,
+    "project_text": 1.0,
+}
+
+
+def feature(token: str) -> int:
+    """Hashed feature index; crc32 is stable across processes, unlike hash()."""
+    return zlib.crc32(token.encode("utf-8")) & (DIM - 1)
+
+
+def job_terms(title: str, description: Optional[str]) -> Counter:
+    """Weighted terms of a posting: title words count double."""
+    terms = Counter(tokenize(description))
+    for token in tokenize(title):
+        terms[token] += 2
+    return terms
+
+
+def profile_terms(user) -> Counter:
+    """Weighted terms of a user's skills, preferred titles, experience and projects."""
+    terms = Counter()
+
+    def add(texts: Iterable[Optional[str]], weight: float):
+        for text in texts:
+            for token in tokenize(text):
+                terms[token] += weight
+
+    add(user.skills or [], PROFILE_WEIGHTS["skills"])
+    add(user.job_preferences or [], PROFILE_WEIGHTS["job_preferences"])
+    for item in user.experience or []:
+        if isinstance(item, dict):
+            add([item.get("role")], PROFILE_WEIGHTS["experience_role"])
+            add([item.get("description")], PROFILE_WEIGHTS["experience_description"])
+    for item in user.projects or []:
+        if isinstance(item, dict):
+            add(item.get("technologies") or [], PROFILE_WEIGHTS["project_technologies"])
+            add([item.get("name"), item.get("role"), item.get("description")], PROFILE_WEIGHTS["project_text"])
+    return terms
+
+
+def _hashed(terms: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """(feature indices, sublinear term frequencies), colliding terms summed."""
+    counts: Dict[int, float] = {}
+    for token, count in terms.items():
+        if count > 0:
+            index = feature(token)
+            counts[index] = counts.get(index, 0.0) + count
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    return indices, 1.0 + np.log(values)
+
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF rows over hashed term features, kept as a CSR
+    matrix in flat numpy arrays (row pointers, feature indices, weights).
+
+    Rows are keyed by integer slot and can be added or replaced one at a
+    time; changes are buffered and folded in on the next read, when IDF
+    and row norms are recomputed in a few vectorized passes. Scoring a
+    query against every row is one sparse matrix-vector product, so no
+    per-job Python runs at query time and no external service is needed.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._removed = set()
+        # CSR over the flushed rows: row r spans indices/tf/data[indptr[r]:indptr[r + 1]]
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._tf = np.zeros(0)
+        self._data = np.zeros(0)
+        self._row_ids = np.zeros(0, dtype=np.int64)  # CSR row of each stored value
+        self._slots = np.zeros(0, dtype=np.int64)  # CSR row -> slot
+        self._row_of: Dict[int, int] = {}  # slot -> CSR row
+        self._idf = np.ones(DIM)
+        self._scratch: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._slots)
+
+    def __contains__(self, slot: int) -> bool:
+        return slot in self._pending or (slot in self._row_of and slot not in self._removed)
+
+    def add(self, slot: int, terms: Dict[str, float]):
+        """Add (or replace) the row of one document from its weighted terms."""
+        self._pending[slot] = _hashed(terms)
+        if slot in self._row_of:
+            self._removed.add(slot)
+
+    def remove(self, slot: int):
+        self._pending.pop(slot, None)
+        if slot in self._row_of:
+            self._removed.add(slot)
+
+    def _flush(self) -> bool:
+        """Fold buffered changes into the CSR arrays. True if anything changed."""
+        if not self._pending and not self._removed:
+            return False
+
+        keep_rows = ~np.isin(self._slots, np.fromiter(self._removed, dtype=np.int64, count=len(self._removed)))
+        lengths = np.diff(self._indptr)[keep_rows]
+        keep_values = keep_rows[self._row_ids] if len(self._row_ids) else np.zeros(0, dtype=bool)
+        new_slots = list(self._pending)
+        new_rows = [self._pending[slot] for slot in new_slots]
+
+        self._slots = np.concatenate([self._slots[keep_rows], np.array(new_slots, dtype=np.int64)])
+        self._indices = np.concatenate([self._indices[keep_values]] + [indices for indices, _ in new_rows])
+        self._tf = np.concatenate([self._tf[keep_values]] + [tf for _, tf in new_rows])
+        lengths = np.concatenate([lengths, np.array([len(indices) for indices, _ in new_rows], dtype=np.int64)])
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._row_ids = np.repeat(np.arange(len(self._slots)), lengths)
+        self._row_of = {int(slot): row for row, slot in enumerate(self._slots)}
+        self._pending.clear()
+        self._removed.clear()
+
+        # Smoothed IDF from document frequencies, then unit-length rows
+        rows = len(self._slots)
+        document_frequency = np.bincount(self._indices, minlength=DIM)
+        self._idf = np.log((1 + rows) / (1 + document_frequency)) + 1.0
+        data = self._tf * self._idf[self._indices]
+        norms = np.sqrt(np.bincount(self._row_ids, weights=data * data, minlength=rows))
+        norms[norms == 0] = 1.0
+        self._data = data / norms[self._row_ids]
+        return True
+
+    def query_vector(self, terms: Dict[str, float]) -> np.ndarray:
+        """Dense unit-length TF-IDF vector for a query (a profile or a document)."""
+        self._flush()
+        indices, tf = _hashed(terms)
+        vector = np.zeros(DIM)
+        np.add.at(vector, indices, tf * self._idf[indices])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def row_vector(self, slot: int) -> Optional[np.ndarray]:
+        """Dense unit-length vector of a stored row, None if the slot is not stored."""
+        self._flush()
+        row = self._row_of.get(slot)
+        if row is None:
+            return None
+        vector = np.zeros(DIM)
+        start, end = self._indptr[row], self._indptr[row + 1]
+        vector[self._indices[start:end]] = self._data[start:end]
+        return vector
+
+    def scores(self, vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row with a unit vector: one sparse matrix-vector product."""
+        self._flush()
+        return np.bincount(self._row_ids, weights=self._data * vector[self._indices], minlength=len(self._slots))
+
+    def row_scores(self, slot: int) -> Optional[np.ndarray]:
+        """Cosine of every row with a stored row (CSR row order, see `slots`), None if not stored."""
+        self._flush()
+        row = self._row_of.get(slot)
+        if row is None:
+            return None
+        # A reused scratch vector: only this row's features are set and then cleared
+        if self._scratch is None:
+            self._scratch = np.zeros(DIM)
+        start, end = self._indptr[row], self._indptr[row + 1]
+        features = self._indices[start:end]
+        self._scratch[features] = self._data[start:end]
+        try:
+            return self.scores(self._scratch)
+        finally:
+            self._scratch[features] = 0.0
+
+    @property
+    def slots(self) -> np.ndarray:
+        """Slot of each CSR row."""
+        self._flush()
+        return self._slots
+
+    def top_k(self, vector: np.ndarray, k: int, accept: Optional[Callable[[int], bool]] = None, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Best (slot, cosine) pairs, highest first, among slots passing `accept`."""
+        scores = self.scores(vector)
+        candidates = np.flatnonzero(scores > min_score)
+        if accept is None and len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for row in order:
+            slot = int(self._slots[row])
+            if accept is None or accept(slot):
+                results.append((slot, float(scores[row])))
+                if len(results) >= k:
+                    break
+        return results
+
+
+class NeighborGraph:
+    """
+    The `k` most similar rows of every row of a TfidfMatrix, kept up to
+    date as rows arrive: a new row gets its own list from one product
+    against the matrix, and the same scores tell which existing rows now
+    have it as a closer neighbor than their current worst. Lookups are a
+    dict access. Scores are the cosines when the edge was found; IDF
+    drift since then is not revisited. Removing a row also drops it from
+    the lists that name it, so its slot can be reused.
+    """
+
+    def __init__(self, k: int = 10, min_score: float = 0.1):
+        self.k = k
+        self.min_score = min_score
+        self._neighbors: Dict[int, List[Tuple[float, int]]] = {}  # slot -> [(cosine, slot)], best first
+        self._named_by: Dict[int, set] = {}  # slot -> slots whose lists name it
+        self._floor = np.zeros(0)  # slot -> score a new neighbor must beat
+
+    def __len__(self) -> int:
+        return len(self._neighbors)
+
+    def neighbors(self, slot: int) -> List[Tuple[int, float]]:
+        return [(neighbor, score) for score, neighbor in self._neighbors.get(slot, ())]
+
+    def remove(self, slot: int):
+        """Drop a row's own list and every edge pointing at it."""
+        self._set(slot, [])
+        for other in self._named_by.pop(slot, ()):
+            self._set(other, [entry for entry in self._neighbors.get(other, []) if entry[1] != slot])
+
+    def _grow(self, size: int):
+        if size > len(self._floor):
+            extra = np.full(max(size - len(self._floor), len(self._floor)), self.min_score)
+            self._floor = np.concatenate([self._floor, extra])
+
+    def _set(self, slot: int, entries: List[Tuple[float, int]]):
+        """Replace a row's list, keeping `_named_by` and its floor in step."""
+        old = {neighbor for _, neighbor in self._neighbors.get(slot, ())}
+        new = {neighbor for _, neighbor in entries}
+        for neighbor in old - new:
+            named_by = self._named_by.get(neighbor)
+            if named_by is not None:
+                named_by.discard(slot)
+                if not named_by:
+                    del self._named_by[neighbor]
+        for neighbor in new - old:
+            self._named_by.setdefault(neighbor, set()).add(slot)
+        if entries:
+            self._neighbors[slot] = entries
+        else:
+            self._neighbors.pop(slot, None)
+        self._grow(slot + 1)
+        self._floor[slot] = entries[-1][0] if len(entries) >= self.k else self.min_score
+
+    def _insert(self, slot: int, neighbor: int, score: float):
+        entries = [entry for entry in self._neighbors.get(slot, []) if entry[1] != neighbor]
+        entries.append((score, neighbor))
+        entries.sort(reverse=True)
+        self._set(slot, entries[:self.k])
+
+    def update(self, matrix: TfidfMatrix, slots: Iterable[int]):
+        """Link rows that were added to (or replaced in) `matrix`."""
+        slots = list(slots)
+        row_slots = matrix.slots
+        # Rows of this batch get complete lists of their own, so only older rows need back-links
+        linked_before = ~np.isin(row_slots, np.array(slots, dtype=np.int64))
+        if len(row_slots):
+            self._grow(int(row_slots.max()) + 1)
+        for slot in slots:
+            scores = matrix.row_scores(slot)
+            if scores is None:
+                self._set(slot, [])
+                continue
+            scores[row_slots == slot] = 0.0
+            candidates = np.flatnonzero(scores > self.min_score)
+
+            best = candidates
+            if len(best) > self.k:
+                best = best[np.argpartition(-scores[best], self.k)[:self.k]]
+            self._set(slot, sorted(((float(scores[row]), int(row_slots[row])) for row in best), reverse=True))
+
+            # Older rows for which the new one beats their current worst neighbor
+            older = candidates[linked_before[candidates]]
+            for row in older[scores[older] > self._floor[row_slots[older]]]:
+                self._insert(int(row_slots[row]), slot, float(scores[row]))
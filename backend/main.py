@@ -1,11 +1,15 @@
-from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import FastAPI, Depends, HTTPException, status, File, UploadFile, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import load_dotenv
+import hashlib
 import io
 import json
 import os
@@ -27,8 +31,24 @@ import schemas
 import auth
 import resume_analyzer
 import chatbot
-from database import engine, get_db
-from scrapers.google_search import search_jobs_google
+import search_cache
+import search_snapshots
+import cache_warmer
+import percolator
+import job_store
+import job_sources
+import job_vectors
+import seen_jobs
+import user_cache
+import user_skills
+import personalization
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import engine, async_engine, get_db, get_async_db
+import http_client
+from company_directory import directory as company_directory
+from search_index import tokenize
+from scrapers import google_search
+from scrapers.google_search import get_upstream_stats
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -42,10 +62,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(chatbot.router)
 
+@app.on_event("startup")
+async def start_cache_warmer():
+    if cache_warmer.CACHE_WARM_ENABLED:
+        cache_warmer.warmer.start()
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    await cache_warmer.warmer.stop()
+    await http_client.close_client()
+    await async_engine.dispose()
+
 @app.get("/")
 def read_root():
     return {"message": "Job Aggregator API is running"}
@@ -54,33 +86,209 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+async def _run_search(request: schemas.JobSearchRequest):
+    result = await job_sources.aggregator.search(request)
+    print(f"DEBUG: Search summary: {result.summary()}")
+    # Don't pin a partial answer in the cache for the full TTL
+    ttl = search_cache.SEARCH_CACHE_DEGRADED_TTL if result.degraded else None
+    return result.jobs, ttl, result.raw_count
+
+async def _ranked_window(request: schemas.JobSearchRequest, start: int, depth: int) -> Tuple[List[schemas.Job], int]:
+    """(ranked jobs, how many results the sources returned for the window before dedupe)."""
+    window = request.copy(update={"start": start, "limit": depth, "cursor": None})
+    key = search_cache.make_key(window)
+    jobs = await search_cache.cache.get_or_fetch(key, lambda: _run_search(window))
+    fetched = search_cache.cache.raw_count(key)
+    return jobs, len(jobs) if fetched is None else fetched
+
+def _personalized(jobs: List[schemas.Job], request: schemas.JobSearchRequest, user: Optional[models.User]) -> List[schemas.Job]:
+    if not request.personalize or user is None:
+        return jobs
+    return personalization.rerank(jobs, personalization.Profile.from_user(user))
+
+def _job_key(job: schemas.Job) -> str:
+    return job.id or job_store.url_hash(job.url)
+
+def _flag_new_jobs(jobs: List[schemas.Job], user: models.User, db: Session) -> List[schemas.Job]:
+    """Flag jobs the user has not been shown before, and record them as shown."""
+    try:
+        flags = seen_jobs.mark_seen(user.id, [_job_key(job) for job in jobs], db)
+    except Exception as e:
+        db.rollback()
+        print(f"Error updating seen jobs: {e}")
+        return jobs
+    return [job.copy(update={"is_new": is_new}) for job, is_new in zip(jobs, flags)]
+
+def _annotate_tracked(jobs: List[schemas.Job], user: models.User, db: Session) -> List[schemas.Job]:
+    """Set `application_status` on jobs the user tracks, with one indexed query for the whole page."""
+    url_hashes = {job_store.url_hash(job.url) for job in jobs if job.url}
+    job_ids = {job.id for job in jobs if job.id}
+    rows = db.query(models.Application.job_url_hash, models.Application.job_id, models.Application.status).filter(
+        models.Application.user_id == user.id,
+        or_(models.Application.job_url_hash.in_(url_hashes), models.Application.job_id.in_(job_ids))
+    ).all()
+    if not rows:
+        return jobs
+    by_url_hash = {row.job_url_hash: row.status for row in rows if row.job_url_hash}
+    by_job_id = {row.job_id: row.status for row in rows if row.job_id}
+    annotated = []
+    for job in jobs:
+        status_value = (by_url_hash.get(job_store.url_hash(job.url)) if job.url else None) or by_job_id.get(job.id)
+        annotated.append(job.copy(update={"application_status": status_value}) if status_value else job)
+    return annotated
+
 @app.post("/search", response_model=List[schemas.Job])
-def search_jobs(request: schemas.JobSearchRequest):
-    # Append company size to query if present
-    query = request.query
-    if request.company_size:
-        size_map = {
-            "Startup": "Startup",
-            "Small": "Small company",
-            "Mid-size": "Mid-size company",
-            "Large": "Large company",
-            "MNC": "MNC"
-        }
-        # Map selected sizes to keywords
-        keywords = [size_map.get(s, s) for s in request.company_size]
-        # Add to query
-        size_query = " OR ".join(keywords)
-        query = f"{query} {size_query}"
-
-    jobs = search_jobs_google(
-        query, 
-        request.location, 
-        request.start,
-        experience_level=request.experience_level,
-        platforms=request.platforms
-    )
+async def search_jobs(
+    request: schemas.JobSearchRequest,
+    response: Response,
+    current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    First page of a search, or the page after `cursor`. The first call ranks
+    SEARCH_SNAPSHOT_DEPTH results into a snapshot; later pages are slices of
+    it (extended one window at a time if the user pages past it). The cursor
+    for the next page is returned in the X-Next-Cursor header.
+
+    With `personalize` and a signed-in user, each window is re-ranked for
+    the user's profile before it enters the snapshot, and every job carries
+    the breakdown of its score in `match`. For a signed-in user, jobs they
+    have not been shown before are flagged `is_new`, and jobs already in
+    their tracker carry its status in `application_status`.
+    """
+    depth = max(request.limit, search_snapshots.SEARCH_SNAPSHOT_DEPTH)
+    user_id = current_user.id if current_user is not None else None
+    try:
+        if request.cursor:
+            snapshot_id, offset = search_snapshots.decode_cursor(request.cursor)
+            snapshot = search_snapshots.store.get(snapshot_id, user_id)
+            if offset + request.limit > len(snapshot.jobs) and not snapshot.exhausted:
+                window, fetched = await _ranked_window(snapshot.request, snapshot.next_start, depth)
+                snapshot.extend(_personalized(window, snapshot.request, current_user), depth, fetched)
+        else:
+            ranked, fetched = await _ranked_window(request, request.start, depth)
+            snapshot_id = search_snapshots.store.create(
+                request, _personalized(ranked, request, current_user), exhausted=fetched < depth, user_id=user_id, fetched=fetched
+            )
+            offset = 0
+        jobs, next_cursor = search_snapshots.store.page(snapshot_id, offset, request.limit, user_id)
+    except search_snapshots.CursorExpired as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except search_snapshots.CursorForbidden as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if current_user is not None and jobs:
+        jobs = await db.run_sync(lambda session: _annotate_tracked(_flag_new_jobs(jobs, current_user, session), current_user, session))
     return jobs
 
+def _stream_cursor(request: schemas.JobSearchRequest, jobs: List[schemas.Job], fetched: int, user_id: Optional[int]) -> Optional[str]:
+    """Snapshot a streamed page so /search can continue it with a cursor (for the same user)."""
+    exhausted = fetched < request.limit
+    snapshot_id = search_snapshots.store.create(request, jobs, exhausted, user_id=user_id, fetched=fetched)
+    return None if exhausted else search_snapshots.encode_cursor(snapshot_id, len(jobs))
+
+def _stream_frame(frame: dict, sse: bool) -> str:
+    data = json.dumps(frame)
+    if sse:
+        return f"event: {frame['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+async def _search_frames(request: schemas.JobSearchRequest, sse: bool, user_id: Optional[int] = None):
+    """
+    Frames for /search/stream: one "jobs" frame per source batch as it
+    arrives, then a "summary" frame with totals, per-source timings, facet
+    counts and the cursor for the next page of /search.
+    """
+    key = search_cache.make_key(request)
+    cached, is_stale = search_cache.cache.get(key)
+    if cached is not None and not is_stale:
+        yield _stream_frame({"type": "jobs", "source": "cache", "elapsed_ms": 0, "jobs": [job.dict() for job in cached]}, sse)
+        yield _stream_frame({
+            "type": "summary",
+            "total": len(cached),
+            "elapsed_ms": 0,
+            "cached": True,
+            "sources": {},
+            "next_cursor": _stream_cursor(request, cached, search_cache.cache.raw_count(key) or len(cached), user_id),
+            "facets": (await job_sources.aggregator.facet_counts(request))["facets"]
+        }, sse)
+        return
+
+    async for result in job_sources.aggregator.stream(request):
+        if isinstance(result, job_sources.SearchResult):
+            ttl = search_cache.SEARCH_CACHE_DEGRADED_TTL if result.degraded else None
+            search_cache.cache.set(key, result.jobs, ttl, result.raw_count)
+            yield _stream_frame({
+                "type": "summary",
+                "cached": False,
+                "next_cursor": _stream_cursor(request, result.jobs, result.raw_count, user_id),
+                "facets": (await job_sources.aggregator.facet_counts(request))["facets"],
+                **result.summary()
+            }, sse)
+        elif result.jobs:
+            yield _stream_frame({
+                "type": "jobs",
+                "source": result.source,
+                "elapsed_ms": round(result.elapsed_ms, 1),
+                "jobs": [job.dict() for job in result.jobs]
+            }, sse)
+
+@app.post("/search/stream")
+async def search_jobs_stream(
+    request: schemas.JobSearchRequest,
+    http_request: Request,
+    current_user: Optional[models.User] = Depends(auth.get_current_user_optional)
+):
+    """
+    Streaming variant of /search. Emits newline-delimited JSON by default,
+    or Server-Sent Events when the client sends Accept: text/event-stream.
+    """
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    user_id = current_user.id if current_user is not None else None
+    return StreamingResponse(_search_frames(request, sse, user_id), media_type=media_type)
+
+@app.post("/search/facets")
+async def search_facets(request: schemas.JobSearchRequest):
+    """
+    How many results each filter value (platform, experience band, company
+    size, work mode, city) has for this search, from the bitmap indexes of
+    the local job store and fixture catalog.
+    """
+    return await job_sources.aggregator.facet_counts(request)
+
+@app.get("/search/cache-stats")
+def search_cache_stats():
+    """Hit/miss counters for the search result cache (for monitoring)."""
+    return search_cache.cache.stats()
+
+@app.get("/search/warmer-stats")
+def search_warmer_stats():
+    """Runs and refresh counts of the background cache warmer."""
+    return cache_warmer.warmer.stats()
+
+@app.get("/search/upstream-stats")
+def search_upstream_stats():
+    """Custom Search quota, circuit breaker and request coalescing counters."""
+    return get_upstream_stats()
+
+@app.get("/http-stats")
+def outbound_http_stats():
+    """Per-host latency, error, retry and circuit breaker state for outbound calls."""
+    return http_client.client.get_stats()
+
+@app.get("/auth/user-cache-stats")
+def user_cache_stats():
+    """Hit/miss and invalidation counters for the authenticated-user cache."""
+    return user_cache.cache.stats()
+
+@app.get("/search/source-stats")
+def search_source_stats():
+    """Per-source call, timeout and latency counters for the search aggregator."""
+    return job_sources.aggregator.get_stats()
+
 # Auth Endpoints
 @app.post("/register", response_model=schemas.UserResponse)
 def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
@@ -119,76 +327,128 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     access_token = auth.create_access_token(data={"sub": user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/users/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
-    return current_user
+PROFILE_FIELDS = tuple(schemas.UserResponse.model_fields)
+
+def _profile_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse `fields=full_name,avatar` (id is always included); None means the whole profile."""
+    if not fields:
+        return None
+    requested = sorted({name.strip() for name in fields.split(",") if name.strip()} | {"id"})
+    unknown = [name for name in requested if name not in PROFILE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(PROFILE_FIELDS)}")
+    return requested
+
+def _profile_etag(user: models.User, fields: Optional[List[str]] = None) -> str:
+    """"<user id>.<profile_version>", plus a hash of the field set for sparse responses."""
+    tag = f"{user.id}.{user.profile_version or 0}"
+    if fields:
+        tag += "." + hashlib.sha1(",".join(fields).encode("utf-8")).hexdigest()[:8]
+    return f'"{tag}"'
+
+def _etag_matches(header: Optional[str], etag: str, any_fields: bool = False) -> bool:
+    """Whether an If-None-Match / If-Match header lists `etag`. With `any_fields` only the profile version has to match."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    def version(tag: str) -> str:
+        tag = tag.strip().removeprefix("W/").strip('"')
+        return ".".join(tag.split(".")[:2]) if any_fields else tag
+    return any(version(candidate) == version(etag) for candidate in header.split(","))
+
+def _profile_response(user: models.User, fields: Optional[List[str]]) -> JSONResponse:
+    payload = {name: getattr(user, name) for name in fields or PROFILE_FIELDS}
+    return JSONResponse(
+        content=jsonable_encoder(payload),
+        headers={"ETag": _profile_etag(user, fields), "Cache-Control": "private, no-cache"}
+    )
 
-@app.put("/users/me", response_model=schemas.UserResponse)
-def update_user_me(user_update: schemas.UserUpdate, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
-    print(f"--- Updating user profile for: {current_user.email} ---")
-    
+def _apply_profile_update(user: models.User, values: dict, db: Session) -> List[str]:
+    """Set the given profile fields where they differ from what is stored; returns the changed names."""
     changes = []
-    if user_update.full_name is not None:
-        current_user.full_name = user_update.full_name
-        changes.append("full_name")
-    if user_update.address is not None:
-        current_user.address = user_update.address
-        changes.append("address")
-    if user_update.location is not None:
-        current_user.location = user_update.location
-        changes.append("location")
-    if user_update.experience_level is not None:
-        current_user.experience_level = user_update.experience_level
-        changes.append("experience_level")
-    if user_update.total_experience is not None:
-        current_user.total_experience = user_update.total_experience
-        changes.append("total_experience")
-    if user_update.skills is not None:
-        current_user.skills = user_update.skills
-        changes.append("skills")
-    if user_update.preferred_locations is not None:
-        current_user.preferred_locations = user_update.preferred_locations
-        changes.append("preferred_locations")
-    if user_update.avatar is not None:
-        current_user.avatar = user_update.avatar
-        changes.append("avatar")
-    if user_update.education is not None:
-        current_user.education = user_update.education
-        changes.append("education")
-    if user_update.experience is not None:
-        current_user.experience = user_update.experience
-        changes.append("experience")
-    if user_update.job_preferences is not None:
-        current_user.job_preferences = user_update.job_preferences
-        changes.append("job_preferences")
-    if user_update.projects is not None:
-        current_user.projects = user_update.projects
-        changes.append("projects")
-    if user_update.linkedin_url is not None:
-        current_user.linkedin_url = user_update.linkedin_url
-        changes.append("linkedin_url")
-    if user_update.github_url is not None:
-        current_user.github_url = user_update.github_url
-        changes.append("github_url")
-    if user_update.portfolio_url is not None:
-        current_user.portfolio_url = user_update.portfolio_url
-        changes.append("portfolio_url")
-        
+    for name, value in values.items():
+        if getattr(user, name) != value:
+            setattr(user, name, value)
+            changes.append(name)
+    if changes:
+        user.profile_version = (user.profile_version or 0) + 1
+    if "skills" in changes:
+        user_skills.sync(user, db)
+    return changes
+
+def _save_profile(user: models.User, changes: List[str], fields: Optional[List[str]], db: Session) -> JSONResponse:
+    """Commit a profile update (if anything changed) and respond with the new profile and ETag."""
+    # Built before the commit expires the user, so no reload is needed
+    response = _profile_response(user, fields)
+    if not changes:
+        print(f"--- No profile changes for {user.email} ---")
+        return response
+
+    email = user.email
     db.commit()
-    db.refresh(current_user)
-    
+    user_cache.cache.invalidate(email, db)
+
     # Log update activity
     try:
         from activity_logger import log_activity
-        log_activity(current_user.email, "PROFILE_UPDATE", f"Updated fields: {', '.join(changes)}")
+        log_activity(email, "PROFILE_UPDATE", f"Updated fields: {', '.join(changes)}")
     except Exception as e:
         print(f"Logging failed: {e}")
 
     print(f"--- Profile updated successfully ---")
-    return current_user
+    return response
+
+@app.get("/users/me", response_model=schemas.UserResponse)
+def read_users_me(request: Request, fields: Optional[str] = None, current_user: models.User = Depends(auth.get_current_user)):
+    """
+    The signed-in user's profile, or only the comma-separated `fields`.
+    Responses carry an ETag that changes with every profile update; send
+    it back in If-None-Match to get an empty 304 while nothing changed.
+    """
+    fields = _profile_fields(fields)
+    etag = _profile_etag(current_user, fields)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return _profile_response(current_user, fields)
+
+@app.put("/users/me", response_model=schemas.UserResponse)
+def update_user_me(user_update: schemas.UserUpdate, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
+    """Update the profile; fields sent as null are left unchanged."""
+    print(f"--- Updating user profile for: {current_user.email} ---")
+    current_user = auth.load_user_for_update(current_user, db)
+    values = {name: value for name, value in user_update.dict().items() if value is not None}
+    changes = _apply_profile_update(current_user, values, db)
+    return _save_profile(current_user, changes, None, db)
+
+@app.patch("/users/me", response_model=schemas.UserResponse)
+def patch_user_me(
+    user_update: schemas.UserUpdate,
+    request: Request,
+    fields: Optional[str] = None,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Update only the fields present in the body (null clears a field);
+    columns whose value did not change are not written. With If-Match,
+    the update is refused (412) if the profile changed since that ETag.
+    Responds with the profile, or only `fields`, and its new ETag.
+    """
+    print(f"--- Patching user profile for: {current_user.email} ---")
+    fields = _profile_fields(fields)
+    current_user = auth.load_user_for_update(current_user, db)
+    if_match = request.headers.get("if-match")
+    if if_match and not _etag_matches(if_match, _profile_etag(current_user), any_fields=True):
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Profile was changed elsewhere; reload it and try again")
+    changes = _apply_profile_update(current_user, user_update.dict(exclude_unset=True), db)
+    return _save_profile(current_user, changes, fields, db)
 
 @app.get("/notifications")
-def get_notifications(current_user: models.User = Depends(auth.get_current_user)):
+def get_notifications(
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
     """
     Generate dynamic notifications based on user profile, skills, and preferences.
     """
@@ -290,14 +550,46 @@ def get_notifications(current_user: models.User = Depends(auth.get_current_user)
 
         # 5. Job Alerts
         try:
-            if current_user.job_preferences and current_user.preferred_locations:
+            alert_counts = percolator.unseen_counts(current_user.id, db)
+            if alert_counts:
+                # Real matches of newly stored jobs against the user's saved searches
+                top_id = max(alert_counts, key=alert_counts.get)
+                top = db.query(models.SavedSearch).filter(models.SavedSearch.id == top_id).first()
+                total = sum(alert_counts.values())
+                where = f" in {top.location}" if top.location else ""
+                message = f"{alert_counts[top_id]} new {top.query} jobs{where} since you last looked."
+                if len(alert_counts) > 1:
+                    message += f" {total} new matches across {len(alert_counts)} saved searches."
+                notifications.append({
+                    "id": "new-jobs",
+                    "type": "success",
+                    "title": "New Jobs Found",
+                    "message": message,
+                    "unread": total,
+                    "action_label": "View Jobs",
+                    "action_link": f"/?q={top.query}&location={top.location or ''}"
+                })
+            elif current_user.job_preferences and current_user.preferred_locations:
                 role = current_user.job_preferences[0]
                 loc = current_user.preferred_locations[0]
+                # Pre-fetched by the cache warmer, so this costs no upstream call
+                warm_key = search_cache.make_key(cache_warmer.warm_request(role, loc))
+                warm_jobs, _ = search_cache.cache.get(warm_key)
+                message = f"3 new {role} jobs in {loc} posted today."
+                unread = None
+                if warm_jobs is not None:
+                    # Unread: results the user has not been shown by /search yet
+                    unread = seen_jobs.count_unseen(current_user.id, [_job_key(job) for job in warm_jobs], db)
+                    if unread < len(warm_jobs):
+                        message = f"{unread} new {role} jobs in {loc} since you last looked."
+                    else:
+                        message = f"{len(warm_jobs)} {role} jobs in {loc} ready to view."
                 notifications.append({
                     "id": "new-jobs",
                     "type": "success",
                     "title": "New Jobs Found",
-                    "message": f"3 new {role} jobs in {loc} posted today.",
+                    "message": message,
+                    "unread": unread,
                     "action_label": "View Jobs",
                     "action_link": f"/?q={role}&location={loc}"
                 })
@@ -333,7 +625,7 @@ SKILL_KNOWLEDGE_BASE = {
 @app.get("/recommendations")
 def get_recommendations(current_user: models.User = Depends(auth.get_current_user)):
     """Suggests skills based on user's job preferences and missing skills."""
-    user_skills = set(s.lower() for s in current_user.skills)
+    profile_skills = set(s.lower() for s in current_user.skills)
     recommendations = []
     
     # Analyze based on job preferences
@@ -344,7 +636,7 @@ def get_recommendations(current_user: models.User = Depends(auth.get_current_use
             for role, required_skills in SKILL_KNOWLEDGE_BASE.items():
                 if role.lower() in pref.lower() or pref.lower() in role.lower():
                     for skill in required_skills:
-                        if skill.lower() not in user_skills:
+                        if skill.lower() not in profile_skills:
                             recommendations.append({
                                 "skill": skill,
                                 "role": role,
@@ -366,6 +658,50 @@ def get_recommendations(current_user: models.User = Depends(auth.get_current_use
             
     return list(unique_recommendations.values())
 
+@app.get("/jobs/for-me", response_model=List[schemas.Job])
+async def get_jobs_for_me(
+    location: str = "",
+    limit: int = 20,
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    Stored and catalog jobs closest to the user's skills, preferred titles,
+    experience and projects (TF-IDF cosine, in `similarity`). Runs offline
+    on the local corpus and never spends search quota.
+    """
+    terms = job_vectors.profile_terms(current_user)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Add skills, job preferences, experience or projects to your profile first")
+    return await job_sources.aggregator.match_profile(terms, location, max(1, min(limit, 50)))
+
+@app.get("/jobs/similar", response_model=List[schemas.Job])
+async def get_similar_jobs(job_id: Optional[str] = None, url: Optional[str] = None, limit: int = 10):
+    """
+    "More like this": stored jobs closest to one job (by id, or by URL as
+    saved in the tracker), with their cosine in `similarity`. Served from
+    the precomputed neighbor graph, so it never spends search quota.
+    """
+    if not job_id and not url:
+        raise HTTPException(status_code=400, detail="Pass job_id or url")
+    limit = max(1, min(limit, job_store.SIMILAR_JOBS_NEIGHBORS))
+    if job_id and job_id.startswith("fixture-") and job_id[len("fixture-"):].isdigit():
+        matches = await run_in_threadpool(google_search._mock_similar_jobs, int(job_id[len("fixture-"):]), limit)
+    else:
+        matches = await run_in_threadpool(job_store.similar_jobs, job_id or job_store.url_hash(url), limit)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Job not found in the local job store")
+    return [job.copy(update={"similarity": round(score, 4)}) for job, score in matches]
+
+@app.get("/skills/popular")
+def get_popular_skills(limit: int = 20, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
+    """Skills listed by the most users, with their user counts (one grouped query over user_skills)."""
+    return [{"skill": name, "users": count} for name, count in user_skills.popular_skills(db, max(1, min(limit, 100)))]
+
+@app.get("/skills/users-count")
+def get_skill_user_count(skill: str, current_user: models.User = Depends(auth.get_current_user), db: Session = Depends(get_db)):
+    """How many users list a skill, under any common spelling ("k8s", "Kubernetes")."""
+    return {"skill": user_skills.display_name(skill), "users": user_skills.count_users_with_skill(skill, db)}
+
 @app.get("/suggestions")
 def get_suggestions(type: str, query: str = ""):
     """Get autocomplete suggestions for various fields"""
@@ -397,7 +733,7 @@ def get_suggestions(type: str, query: str = ""):
 async def analyze_resume_file(
     file: UploadFile = File(...), 
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Analyze an uploaded resume file (PDF only for now) and return an ATS score"""
     
@@ -426,9 +762,10 @@ async def analyze_resume_file(
     
     # Save score to user profile
     try:
+        current_user = await auth.load_user_for_update_async(current_user, db)
         current_user.resume_score = analysis.get('score', 0)
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await user_cache.cache.invalidate_async(current_user.email, db)
         print(f"Saved resume score {current_user.resume_score} for {current_user.email}")
     except Exception as e:
         print(f"Failed to save resume score: {e}")
@@ -441,7 +778,7 @@ async def analyze_resume_file(
 async def upload_resume(
     file: UploadFile = File(...),
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload and store resume file for the user"""
     try:
@@ -459,9 +796,10 @@ async def upload_resume(
             shutil.copyfileobj(file.file, buffer)
             
         # Update user profile
+        current_user = await auth.load_user_for_update_async(current_user, db)
         current_user.resume_path = file_path
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        await user_cache.cache.invalidate_async(current_user.email, db)
         
         print(f"Resume saved to {file_path} for user {current_user.email}")
         return {"filename": file.filename, "path": file_path, "message": "Resume uploaded successfully"}
@@ -940,14 +1278,76 @@ def get_applications(
     """Get all job applications for the current user"""
     return db.query(models.Application).filter(models.Application.user_id == current_user.id).order_by(models.Application.updated_at.desc()).all()
 
+def _find_tracked_application(application: schemas.ApplicationCreate, user_id: int, db: Session) -> Optional[models.Application]:
+    """Same job URL (normalized), or same resolved company and title ("Google Careers" is "Google") when either has no URL"""
+    if application.job_url:
+        tracked = db.query(models.Application).filter(
+            models.Application.user_id == user_id,
+            models.Application.job_url_hash == job_store.url_hash(application.job_url)
+        ).first()
+        if tracked:
+            return tracked
+    # Company and title only identify a job when one side has no URL: two postings with
+    # different URLs are different jobs, even with the same title at the same company
+    title = tokenize(application.job_title)
+    if not title:
+        return None
+    candidates = db.query(models.Application).filter(
+        models.Application.user_id == user_id,
+        func.lower(models.Application.job_title).like("%" + "%".join(title) + "%")
+    )
+    if application.job_url:
+        candidates = candidates.filter(or_(models.Application.job_url.is_(None), models.Application.job_url == ""))
+    company_key = company_directory.company_key(application.company)
+    for tracked in candidates:
+        if company_directory.company_key(tracked.company) == company_key and tokenize(tracked.job_title) == title:
+            return tracked
+    return None
+
+@app.get("/applications/companies")
+def get_application_companies(
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Tracked applications grouped by company, industry and company size"""
+    by_company, by_industry, by_size = {}, {}, {}
+    for tracked in db.query(models.Application).filter(models.Application.user_id == current_user.id).all():
+        company = company_directory.resolve(tracked.company)
+        name = company.name if company else tracked.company
+        industry = company.industry if company else "Unknown"
+        size = company.size if company else "Unknown"
+        entry = by_company.setdefault(name, {"company": name, "industry": industry, "size": size, "applications": 0})
+        entry["applications"] += 1
+        by_industry[industry] = by_industry.get(industry, 0) + 1
+        by_size[size] = by_size.get(size, 0) + 1
+    return {
+        "companies": sorted(by_company.values(), key=lambda entry: entry["applications"], reverse=True),
+        "industries": by_industry,
+        "sizes": by_size
+    }
+
+@app.get("/companies/resolve")
+def resolve_company(name: str):
+    """Canonical company, size and industry for a company name as it appears in a posting (close spellings accepted)"""
+    company = company_directory.resolve(name, fuzzy=True)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not in directory")
+    return company.to_dict()
+
 @app.post("/applications", response_model=schemas.ApplicationResponse)
 def create_application(
     application: schemas.ApplicationCreate,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Track a new job application"""
-    db_application = models.Application(**application.dict(), user_id=current_user.id)
+    """Track a new job application (returns the existing one if this job is already tracked)"""
+    existing = _find_tracked_application(application, current_user.id, db)
+    if existing:
+        return existing
+
+    data = application.dict()
+    data["job_url_hash"] = job_store.url_hash(data["job_url"]) if data["job_url"] else None
+    db_application = models.Application(**data, user_id=current_user.id)
     db.add(db_application)
     db.commit()
     db.refresh(db_application)
@@ -988,3 +1388,90 @@ def delete_application(
     db.delete(db_app)
     db.commit()
     return {"message": "Application deleted successfully"}
+
+# --- Saved Search (Job Alert) Endpoints ---
+def _saved_search_response(saved: models.SavedSearch, new_matches: int = 0) -> schemas.SavedSearchResponse:
+    return schemas.SavedSearchResponse(
+        id=saved.id,
+        query=saved.query,
+        location=saved.location,
+        experience_level=saved.experience_level,
+        platforms=saved.platforms,
+        created_at=saved.created_at,
+        new_matches=new_matches
+    )
+
+@app.get("/saved-searches", response_model=List[schemas.SavedSearchResponse])
+def get_saved_searches(
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List the current user's saved searches with their unseen match counts"""
+    saved = db.query(models.SavedSearch).filter(models.SavedSearch.user_id == current_user.id).order_by(models.SavedSearch.created_at.desc()).all()
+    counts = percolator.unseen_counts(current_user.id, db)
+    return [_saved_search_response(s, counts.get(s.id, 0)) for s in saved]
+
+@app.post("/saved-searches", response_model=schemas.SavedSearchResponse)
+def create_saved_search(
+    search: schemas.SavedSearchCreate,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Save a search; jobs stored from now on that match it become alerts"""
+    if not percolator.is_searchable(search.query):
+        raise HTTPException(status_code=400, detail="Search query has no searchable words")
+    db_search = models.SavedSearch(
+        user_id=current_user.id,
+        query=search.query.strip(),
+        location=search.location,
+        experience_level=search.experience_level or [],
+        platforms=search.platforms or []
+    )
+    db.add(db_search)
+    db.commit()
+    db.refresh(db_search)
+    # Only once the row exists, so a failed commit never leaves a phantom alert behind
+    percolator.register(db_search)
+    return _saved_search_response(db_search)
+
+@app.get("/saved-searches/{search_id}/matches", response_model=List[schemas.Job])
+def get_saved_search_matches(
+    search_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Unseen jobs matching a saved search, newest first. Marks them as seen."""
+    saved = db.query(models.SavedSearch).filter(models.SavedSearch.id == search_id, models.SavedSearch.user_id == current_user.id).first()
+    if not saved:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    matches = db.query(models.SavedSearchMatch).filter(
+        models.SavedSearchMatch.saved_search_id == search_id,
+        models.SavedSearchMatch.seen == False
+    ).order_by(models.SavedSearchMatch.matched_at.desc()).all()
+    if not matches:
+        return []
+
+    jobs = job_store.load_jobs([m.url_hash for m in matches], db)
+    for match in matches:
+        match.seen = True
+    db.commit()
+    return jobs
+
+@app.delete("/saved-searches/{search_id}")
+def delete_saved_search(
+    search_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a saved search and its alerts"""
+    saved = db.query(models.SavedSearch).filter(models.SavedSearch.id == search_id, models.SavedSearch.user_id == current_user.id).first()
+    if not saved:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    db.query(models.SavedSearchMatch).filter(models.SavedSearchMatch.saved_search_id == search_id).delete()
+    db.delete(saved)
+    db.commit()
+    percolator.unregister(search_id)
+    return {"message": "Saved search deleted successfully"}
+
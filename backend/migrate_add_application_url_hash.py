@@ -0,0 +1,37 @@
+from sqlalchemy import inspect, text
+
+from database import engine
+from job_store import url_hash
+
+print(f"Migrating database for application job URL index on {engine.dialect.name}...")
+
+inspector = inspect(engine)
+columns = {column["name"] for column in inspector.get_columns("applications")}
+indexes = {index["name"] for index in inspector.get_indexes("applications")}
+
+with engine.begin() as conn:
+    if "job_url_hash" in columns:
+        print("Skipping job_url_hash: column exists")
+    else:
+        conn.execute(text("ALTER TABLE applications ADD COLUMN job_url_hash VARCHAR(40)"))
+        print("Added job_url_hash column")
+
+    # Backfill hashes of applications tracked before the column existed
+    rows = conn.execute(text(
+        "SELECT id, job_url FROM applications WHERE job_url IS NOT NULL AND job_url != '' AND job_url_hash IS NULL"
+    )).fetchall()
+    if rows:
+        conn.execute(
+            text("UPDATE applications SET job_url_hash = :job_url_hash WHERE id = :id"),
+            [{"job_url_hash": url_hash(job_url), "id": app_id} for app_id, job_url in rows]
+        )
+    print(f"Backfilled {len(rows)} job URL hashes")
+
+    for name, column in (("ix_applications_user_job_url_hash", "job_url_hash"), ("ix_applications_user_job_id", "job_id")):
+        if name in indexes:
+            print(f"Skipping {name}: index exists")
+            continue
+        conn.execute(text(f"CREATE INDEX {name} ON applications (user_id, {column})"))
+        print(f"Created {name}")
+
+print("Migration complete.")
@@ -0,0 +1,18 @@
+from sqlalchemy import inspect, text
+
+from database import engine
+
+# Run after migrate_add_application_url_hash.py and migrate_user_json_columns.py, and before
+# migrate_add_user_skills.py (see "Schema migrations" in RENDER_DEPLOYMENT_GUIDE.md)
+print(f"Migrating database for profile_version on {engine.dialect.name}...")
+
+columns = {column["name"] for column in inspect(engine).get_columns("users")}
+
+with engine.begin() as conn:
+    if "profile_version" in columns:
+        print("Skipping profile_version: column exists")
+    else:
+        conn.execute(text("ALTER TABLE users ADD COLUMN profile_version INTEGER NOT NULL DEFAULT 0"))
+        print("Added profile_version column")
+
+print("Migration complete.")
@@ -0,0 +1,24 @@
+import models
+import user_skills
+from database import SessionLocal, engine
+
+# Run last, after migrate_user_json_columns.py (see "Schema migrations" in RENDER_DEPLOYMENT_GUIDE.md)
+
+print("Migrating database for the user_skills table...")
+
+models.Base.metadata.create_all(bind=engine, tables=[models.Skill.__table__, models.UserSkill.__table__])
+print("Created skills and user_skills tables (if missing)")
+
+# Backfill from the skills list stored on each user
+db = SessionLocal()
+try:
+    # Only the columns sync reads, so other users columns (profile_version) need not exist yet
+    users = db.query(models.User.id, models.User.skills).filter(models.User.skills.isnot(None)).all()
+    for user in users:
+        user_skills.sync(user, db)
+    db.commit()
+    print(f"Backfilled skills of {len(users)} users ({db.query(models.UserSkill).count()} user skills, {db.query(models.Skill).count()} distinct)")
+finally:
+    db.close()
+
+print("Migration complete.")
@@ -0,0 +1,59 @@
+import json
+
+from sqlalchemy import inspect, text
+
+from database import engine
+
+# users columns that were JSON strings in Text columns and are now JSON (JSONB on Postgres)
+COLUMNS = ["skills", "education", "experience", "job_preferences", "projects", "preferred_locations"]
+
+
+def normalized(value):
+    """The stored text as a JSON list: NULL, empty or invalid values become [] (as the old properties read them)."""
+    try:
+        parsed = json.loads(value) if value else []
+    except (json.JSONDecodeError, TypeError):
+        parsed = []
+    return json.dumps(parsed if isinstance(parsed, list) else [])
+
+
+print(f"Migrating users profile columns to JSON on {engine.dialect.name}...")
+
+existing = {column["name"] for column in inspect(engine).get_columns("users")}
+columns = [column for column in COLUMNS if column in existing]
+skipped = [column for column in COLUMNS if column not in existing]
+if skipped:
+    print(f"Skipping missing columns: {', '.join(skipped)}")
+
+with engine.begin() as conn:
+    # Rewrite values the JSON type could not decode
+    rows = conn.execute(text(f"SELECT id, {', '.join(columns)} FROM users")).fetchall()
+    fixed = 0
+    for row in rows:
+        updates = {}
+        for column, value in zip(columns, row[1:]):
+            if isinstance(value, (list, dict)):
+                continue  # Already a native JSON column
+            if normalized(value) != value:
+                updates[column] = normalized(value)
+        if updates:
+            assignments = ", ".join(f"{column} = :{column}" for column in updates)
+            conn.execute(text(f"UPDATE users SET {assignments} WHERE id = :id"), {**updates, "id": row[0]})
+            fixed += 1
+    print(f"Normalized {fixed} of {len(rows)} users")
+
+    if engine.dialect.name == "postgresql":
+        types = dict(conn.execute(text(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'users'"
+        )).fetchall())
+        for column in columns:
+            if types.get(column) == "jsonb":
+                print(f"Skipping {column}: already jsonb")
+                continue
+            conn.execute(text(f"ALTER TABLE users ALTER COLUMN {column} DROP DEFAULT"))
+            conn.execute(text(f"ALTER TABLE users ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"))
+            conn.execute(text(f"ALTER TABLE users ALTER COLUMN {column} SET DEFAULT '[]'::jsonb"))
+            print(f"Converted {column} to jsonb")
+    # SQLite stores JSON as text, so the normalized values are all it needs
+
+print("Migration complete.")
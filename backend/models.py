@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, Date, DateTime, Enum, UniqueConstraint, LargeBinary, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy.orm import validates
 from database import Base
-import json
 import enum
 from datetime import datetime
 
+# A JSON list decoded once when the row loads (JSONB on Postgres); in-place
+# changes such as append() mark the row dirty. See migrate_user_json_columns.py
+# and migrate_saved_search_json_columns.py
+JSONList = MutableList.as_mutable(JSON().with_variant(JSONB(), "postgresql"))
+
 class ApplicationStatus(str, enum.Enum):
     SAVED = "Saved"
     APPLIED = "Applied"
@@ -13,6 +20,11 @@ class ApplicationStatus(str, enum.Enum):
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        # Batched "already tracked" lookups for search results (see main._annotate_tracked)
+        Index("ix_applications_user_job_url_hash", "user_id", "job_url_hash"),
+        Index("ix_applications_user_job_id", "user_id", "job_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -25,9 +37,98 @@ class Application(Base):
     notes = Column(Text, nullable=True)
     salary = Column(String, nullable=True)
     job_url = Column(String, nullable=True)
+    job_url_hash = Column(String(40), nullable=True)  # job_store.url_hash(job_url)
     platform = Column(String, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class Job(Base):
+    """Local corpus of every job returned by an upstream search (see job_store.py)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url_hash = Column(String(40), unique=True, index=True)  # sha1 of the normalized URL
+    url = Column(String)
+    title = Column(String)
+    company = Column(String)
+    location = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    source = Column(String)
+    posted_date = Column(String, nullable=True)
+    salary = Column(String, nullable=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    last_seen_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class SavedSearch(Base):
+    """A search a user wants alerts for; new jobs are matched against it by percolator.py"""
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    query = Column(String)
+    location = Column(String, nullable=True)
+    experience_level = Column(JSONList, default=list)
+    platforms = Column(JSONList, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @validates("experience_level", "platforms")
+    def _validate_list(self, key, value):
+        return value if isinstance(value, list) else []
+
+class SavedSearchMatch(Base):
+    """A stored job that matched a saved search after the search was saved"""
+    __tablename__ = "saved_search_matches"
+    __table_args__ = (UniqueConstraint("saved_search_id", "url_hash"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.id"), index=True)
+    url_hash = Column(String(40))  # jobs.url_hash
+    matched_at = Column(DateTime, default=datetime.utcnow)
+    seen = Column(Boolean, default=False)
+
+class SeenJobSet(Base):
+    """Jobs already shown to a user, as a serialized scalable Bloom filter (see seen_jobs.py)"""
+    __tablename__ = "seen_job_sets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True)
+    data = Column(LargeBinary)
+    item_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class UserCacheInvalidation(Base):
+    """A user row changed; workers drop it from their user cache (see user_cache.py)"""
+    __tablename__ = "user_cache_invalidations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ApiQuotaUsage(Base):
+    """Upstream API calls spent on one quota day, shared by all workers and restarts (see quota_usage.py)"""
+    __tablename__ = "api_quota_usage"
+
+    api = Column(String(40), primary_key=True)
+    day = Column(Date, primary_key=True)
+    used = Column(Integer, nullable=False, default=0)
+
+class Skill(Base):
+    """One canonical skill; users' spellings of it ("k8s", "Kubernetes") share a row (see user_skills.py)"""
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, unique=True, index=True)  # user_skills.skill_key()
+    name = Column(String)  # Display name
+
+class UserSkill(Base):
+    """users.skills as rows, for indexed "who knows X" lookups; kept in step by user_skills.sync"""
+    __tablename__ = "user_skills"
+    __table_args__ = (
+        Index("ix_user_skills_skill_user", "skill_id", "user_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -42,112 +143,18 @@ class User(Base):
     linkedin_url = Column(String, nullable=True)
     github_url = Column(String, nullable=True)
     portfolio_url = Column(String, nullable=True)
-    _skills = Column("skills", Text, nullable=True, default="[]") # Store as JSON string
-
-    @property
-    def skills(self):
-        if self._skills and self._skills != "[]":
-            try:
-                return json.loads(self._skills)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @skills.setter
-    def skills(self, value):
-        if value is None:
-            self._skills = "[]"
-        else:
-            self._skills = json.dumps(value) if isinstance(value, list) else "[]"
-
-    _education = Column("education", Text, nullable=True, default="[]")
-    _experience = Column("experience", Text, nullable=True, default="[]")
-    _job_preferences = Column("job_preferences", Text, nullable=True, default="[]")
-    _projects = Column("projects", Text, nullable=True, default="[]")
-
-    @property
-    def education(self):
-        if self._education and self._education != "[]":
-            try:
-                return json.loads(self._education)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @education.setter
-    def education(self, value):
-        if value is None:
-            self._education = "[]"
-        else:
-            self._education = json.dumps(value) if isinstance(value, list) else "[]"
-
-    @property
-    def experience(self):
-        if self._experience and self._experience != "[]":
-            try:
-                return json.loads(self._experience)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @experience.setter
-    def experience(self, value):
-        if value is None:
-            self._experience = "[]"
-        else:
-            self._experience = json.dumps(value) if isinstance(value, list) else "[]"
-
-    @property
-    def job_preferences(self):
-        if self._job_preferences and self._job_preferences != "[]":
-            try:
-                return json.loads(self._job_preferences)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @job_preferences.setter
-    def job_preferences(self, value):
-        if value is None:
-            self._job_preferences = "[]"
-        else:
-            self._job_preferences = json.dumps(value) if isinstance(value, list) else "[]"
-
-    @property
-    def projects(self):
-        if self._projects and self._projects != "[]":
-            try:
-                return json.loads(self._projects)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @projects.setter
-    def projects(self, value):
-        if value is None:
-            self._projects = "[]"
-        else:
-            self._projects = json.dumps(value) if isinstance(value, list) else "[]"
-
+    skills = Column(JSONList, default=list)
+    education = Column(JSONList, default=list)
+    experience = Column(JSONList, default=list)
+    job_preferences = Column(JSONList, default=list)
+    projects = Column(JSONList, default=list)
     total_experience = Column(String, nullable=True)
-    
-    _preferred_locations = Column("preferred_locations", Text, nullable=True, default="[]")
-
-    @property
-    def preferred_locations(self):
-        if self._preferred_locations and self._preferred_locations != "[]":
-            try:
-                return json.loads(self._preferred_locations)
-            except (json.JSONDecodeError, TypeError):
-                return []
-        return []
-
-    @preferred_locations.setter
-    def preferred_locations(self, value):
-        if value is None:
-            self._preferred_locations = "[]"
-        else:
-            self._preferred_locations = json.dumps(value) if isinstance(value, list) else "[]"
-
+    preferred_locations = Column(JSONList, default=list)
     resume_score = Column(Integer, nullable=True)
     resume_path = Column(String, nullable=True)
+    profile_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every profile change (ETag)
+
+    @validates("skills", "education", "experience", "job_preferences", "projects", "preferred_locations")
+    def _validate_list(self, key, value):
+        # Same contract as the old Text columns: anything that isn't a list is stored as []
+        return value if isinstance(value, list) else []
@@ -0,0 +1,179 @@
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import facets
+import models
+from database import SessionLocal, engine
+from search_index import tokenize
+
+
+class SavedQuery:
+    def __init__(self, search_id: int, query: str, location: Optional[str], platforms: List[str], experience_level: List[str]):
+        self.id = search_id
+        self.terms = frozenset(tokenize(query))
+        self.location = (location or "").strip().lower()
+        self.filters = facets.filters_for(platforms, experience_level)
+
+    def matches(self, tokens: Set[str], location: str, attributes: Dict[str, str]) -> bool:
+        """Same rules as job_store.search_local: every query word, the location, then exact filters."""
+        if not self.terms <= tokens:
+            return False
+        if self.location and self.location not in location:
+            return False
+        return facets.matches(attributes, self.filters)
+
+
+class Percolator:
+    """
+    Reverse index of saved searches: instead of re-running every saved
+    search for each new job, each job is run against the saved searches.
+
+    A saved search only matches jobs containing all of its query terms,
+    so it is filed under just one of them (its anchor, the term with the
+    fewest searches filed so far). A job looks up the anchors among its
+    own tokens and only those candidates are checked in full, so the cost
+    per job grows with its token count and the number of plausible
+    searches, not with the total number of saved searches.
+    """
+
+    def __init__(self):
+        self._queries: Dict[int, SavedQuery] = {}
+        self._anchors: Dict[str, Set[int]] = {}
+        self._anchor_of: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def add(self, search_id: int, query: str, location: Optional[str] = None, platforms: List[str] = None, experience_level: List[str] = None) -> bool:
+        saved = SavedQuery(search_id, query, location, platforms, experience_level)
+        if not saved.terms:
+            return False
+        self.remove(search_id)
+        anchor = min(sorted(saved.terms), key=lambda term: len(self._anchors.get(term, ())))
+        self._queries[search_id] = saved
+        self._anchors.setdefault(anchor, set()).add(search_id)
+        self._anchor_of[search_id] = anchor
+        return True
+
+    def remove(self, search_id: int):
+        anchor = self._anchor_of.pop(search_id, None)
+        if anchor is None:
+            return
+        del self._queries[search_id]
+        bucket = self._anchors[anchor]
+        bucket.discard(search_id)
+        if not bucket:
+            del self._anchors[anchor]
+
+    def match(self, title: str, company: str, description: Optional[str], location: Optional[str], url: Optional[str], source: Optional[str] = None) -> List[int]:
+        """Ids of the saved searches a job satisfies."""
+        tokens = set(tokenize(title)) | set(tokenize(company)) | set(tokenize(description))
+        attributes = None
+        matched = []
+        for token in tokens:
+            for search_id in self._anchors.get(token, ()):
+                if attributes is None:
+                    attributes = facets.job_attributes(title, company, description, location, url, source)
+                if self._queries[search_id].matches(tokens, (location or "").lower(), attributes):
+                    matched.append(search_id)
+        return matched
+
+
+# Saved searches of every user, shared by all requests in this worker.
+# Searches saved through other workers are picked up by id before each batch.
+_percolator = Percolator()
+_loaded_max_id = 0
+_lock = threading.Lock()
+
+
+def _sync(db: Session):
+    global _loaded_max_id
+    rows = db.query(models.SavedSearch).filter(models.SavedSearch.id > _loaded_max_id).order_by(models.SavedSearch.id).all()
+    for row in rows:
+        _percolator.add(row.id, row.query, row.location, row.platforms, row.experience_level)
+        _loaded_max_id = max(_loaded_max_id, row.id)
+
+
+def is_searchable(query: str) -> bool:
+    """Whether a saved search with this query could match anything (it has searchable words)."""
+    return bool(tokenize(query))
+
+
+def register(saved: models.SavedSearch) -> bool:
+    """Start matching a newly saved search. False if its query has no searchable words."""
+    with _lock:
+        return _percolator.add(saved.id, saved.query, saved.location, saved.platforms, saved.experience_level)
+
+
+def unregister(search_id: int):
+    with _lock:
+        _percolator.remove(search_id)
+
+
+def _insert_matches(rows: List[dict]):
+    """INSERT ... ON CONFLICT DO NOTHING, so a job matches a saved search once."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(models.SavedSearchMatch).values(rows).on_conflict_do_nothing(
+        index_elements=[models.SavedSearchMatch.saved_search_id, models.SavedSearchMatch.url_hash]
+    )
+
+
+def percolate(jobs: Iterable[dict], db: Optional[Session] = None) -> int:
+    """
+    Match newly stored jobs (job_store rows) against every saved search and
+    record the matches. Returns the number of matches found.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        now = datetime.utcnow()
+        with _lock:
+            _sync(db)
+            if not len(_percolator):
+                return 0
+            pairs = {
+                (search_id, job["url_hash"])
+                for job in jobs
+                for search_id in _percolator.match(job["title"], job["company"], job["description"], job["location"], job["url"], job["source"])
+            }
+        if not pairs:
+            return 0
+
+        # Searches deleted through another worker are dropped here
+        search_ids = {search_id for search_id, _ in pairs}
+        live = {row.id for row in db.query(models.SavedSearch.id).filter(models.SavedSearch.id.in_(search_ids))}
+        for search_id in search_ids - live:
+            unregister(search_id)
+        rows = [
+            {"saved_search_id": search_id, "url_hash": key, "matched_at": now, "seen": False}
+            for search_id, key in pairs if search_id in live
+        ]
+        if rows:
+            db.execute(_insert_matches(rows))
+            db.commit()
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+def unseen_counts(user_id: int, db: Session) -> Dict[int, int]:
+    """Unseen match count per saved search of one user (searches with none are omitted)."""
+    rows = (
+        db.query(models.SavedSearchMatch.saved_search_id, func.count(models.SavedSearchMatch.id))
+        .join(models.SavedSearch, models.SavedSearch.id == models.SavedSearchMatch.saved_search_id)
+        .filter(models.SavedSearch.user_id == user_id, models.SavedSearchMatch.seen == False)
+        .group_by(models.SavedSearchMatch.saved_search_id)
+        .all()
+    )
+    return {search_id: count for search_id, count in rows}
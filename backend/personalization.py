@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import facets
+from schemas import Job, JobMatch
+from search_index import tokenize
+
+# Experience bands in seniority order; distance between bands drives the fit
+BAND_ORDER = ["Internship", "Fresher", "Associate", "Senior", "Lead", "Executive"]
+BAND_TOLERANCE = 2  # Bands apart at which the fit reaches zero
+
+# Weight of each signal in the personalized score: text relevance, skill overlap, experience fit, preferred title
+SIGNALS = ("relevance", "skills", "experience_fit", "preference")
+WEIGHTS = np.array([0.4, 0.35, 0.15, 0.1])
+
+
+class Profile:
+    """What re-ranking uses from a user: skills, experience band and preferred job titles."""
+
+    def __init__(self, skills: List[str], experience_level: Optional[str], job_preferences: List[str]):
+        self.skills = [(skill, tokenize(skill)) for skill in skills or [] if tokenize(skill)]
+        self.band = BAND_ORDER.index(experience_level) if experience_level in BAND_ORDER else None
+        self.preferences = [tokenize(title) for title in job_preferences or [] if tokenize(title)]
+
+    @classmethod
+    def from_user(cls, user) -> "Profile":
+        return cls(user.skills, user.experience_level, user.job_preferences)
+
+    def is_empty(self) -> bool:
+        return not self.skills and self.band is None and not self.preferences
+
+
+def _phrase_matrix(phrases: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """(vocabulary x phrases): column j spreads weight 1 over phrase j's tokens."""
+    matrix = np.zeros((len(vocabulary), len(phrases)))
+    for j, tokens in enumerate(phrases):
+        for token in set(tokens):
+            matrix[vocabulary[token], j] = 1.0 / len(set(tokens))
+    return matrix
+
+
+def _incidence(texts: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """(jobs x vocabulary) 0/1: which profile tokens each job contains."""
+    matrix = np.zeros((len(texts), len(vocabulary)))
+    for i, tokens in enumerate(texts):
+        columns = [vocabulary[token] for token in set(tokens) if token in vocabulary]
+        matrix[i, columns] = 1.0
+    return matrix
+
+
+def score(jobs: List[Job], profile: Profile) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Signal matrix for a ranked page, one row per job and one column per
+    SIGNALS entry, each in [0, 1], plus which profile skills each job
+    has (jobs x skills, boolean). Jobs carry no text score of their own,
+    so relevance is their position in the text ranking. A skill counts
+    when every word of it appears in the job; a preference scores the
+    share of its words found in the title.
+    """
+    n = len(jobs)
+    vocabulary: Dict[str, int] = {}
+    for tokens in [tokens for _, tokens in profile.skills] + profile.preferences:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    signals = np.zeros((n, len(SIGNALS)))
+    signals[:, 0] = 1.0 - np.arange(n) / max(n, 1)
+
+    skill_hits = np.zeros((n, len(profile.skills)), dtype=bool)
+    if profile.skills:
+        texts = _incidence([tokenize(job.title) + tokenize(job.description) for job in jobs], vocabulary)
+        skill_hits = texts @ _phrase_matrix([tokens for _, tokens in profile.skills], vocabulary) > 0.999
+        signals[:, 1] = skill_hits.mean(axis=1)
+
+    if profile.band is not None:
+        bands = np.array([BAND_ORDER.index(facets.experience_band(job.title, job.description)) for job in jobs])
+        signals[:, 2] = np.clip(1.0 - np.abs(bands - profile.band) / BAND_TOLERANCE, 0.0, 1.0)
+
+    if profile.preferences:
+        titles = _incidence([tokenize(job.title) for job in jobs], vocabulary)
+        signals[:, 3] = (titles @ _phrase_matrix(profile.preferences, vocabulary)).max(axis=1)
+
+    return signals, skill_hits
+
+
+def rerank(jobs: List[Job], profile: Profile) -> List[Job]:
+    """
+    Re-order a ranked page for one user: the signal matrix times the
+    weights gives every job's score in one product, and each returned
+    job carries its breakdown in `match`. Jobs are copied, never changed,
+    since the cache shares them between users.
+    """
+    if not jobs or profile.is_empty():
+        return jobs
+    signals, skill_hits = score(jobs, profile)
+    totals = signals @ WEIGHTS
+    order = np.argsort(-totals, kind="stable")
+
+    reranked = []
+    for i in order:
+        reranked.append(jobs[i].copy(update={"match": JobMatch(
+            score=round(float(totals[i]), 4),
+            matched_skills=[profile.skills[j][0] for j in np.flatnonzero(skill_hits[i])],
+            **{signal: round(float(signals[i, k]), 4) for k, signal in enumerate(SIGNALS)}
+        )}))
+    return reranked
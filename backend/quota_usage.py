@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.exc import IntegrityError
+
+import models
+from database import SessionLocal
+
+
+class DailyQuota:
+    """
+    A daily call quota counted in the database (api_quota_usage), so every
+    worker draws from the same allowance and a restart does not refill it.
+    The day rolls over at midnight in `timezone` (Google resets Custom
+    Search quotas at midnight Pacific time).
+    """
+
+    def __init__(self, api: str, capacity: int, timezone: str = "America/Los_Angeles"):
+        self.api = api
+        self.capacity = capacity
+        self.timezone = ZoneInfo(timezone)
+        self.granted = 0
+        self.denied = 0
+
+    def _today(self) -> date:
+        return datetime.now(self.timezone).date()
+
+    def _locked_row(self, db) -> models.ApiQuotaUsage:
+        """Today's row, created if missing and locked until the caller commits (FOR UPDATE on Postgres)."""
+        today = self._today()
+        key = {"api": self.api, "day": today}
+        if db.get(models.ApiQuotaUsage, key) is None:
+            try:
+                with db.begin_nested():
+                    db.add(models.ApiQuotaUsage(api=self.api, day=today, used=0))
+            except IntegrityError:
+                pass  # Another worker created it first
+        return db.query(models.ApiQuotaUsage).filter_by(**key).with_for_update().one()
+
+    def acquire_up_to(self, n: int) -> int:
+        """Spend as many of today's remaining calls as are available, up to n. Returns the number taken."""
+        db = SessionLocal()
+        try:
+            row = self._locked_row(db)
+            taken = max(0, min(n, self.capacity - row.used))
+            row.used += taken
+            db.commit()
+        finally:
+            db.close()
+        self.granted += taken
+        self.denied += n - taken
+        return taken
+
+    def drain(self):
+        """Mark today's quota as spent, e.g. after the upstream reported it exhausted."""
+        db = SessionLocal()
+        try:
+            row = self._locked_row(db)
+            row.used = max(row.used, self.capacity)
+            db.commit()
+        finally:
+            db.close()
+
+    def used(self) -> int:
+        db = SessionLocal()
+        try:
+            row = db.get(models.ApiQuotaUsage, {"api": self.api, "day": self._today()})
+            return row.used if row else 0
+        finally:
+            db.close()
+
+    def available(self) -> int:
+        return max(0, self.capacity - self.used())
+
+    def stats(self) -> dict:
+        used = self.used()
+        return {
+            "capacity": self.capacity,
+            "used_today": used,
+            "available": max(0, self.capacity - used),
+            "granted": self.granted,
+            "denied": self.denied,
+        }
@@ -1,27 +1,63 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
 # Job Schemas
+class JobLink(BaseModel):
+    source: str
+    url: str
+
+class JobMatch(BaseModel):
+    # Why a job ranked where it did for the signed-in user (personalized search)
+    score: float
+    relevance: float
+    skills: float
+    experience_fit: float
+    preference: float
+    matched_skills: List[str] = []
+
 class Job(BaseModel):
     id: Optional[str] = None
     title: str
     company: str
+    company_id: Optional[int] = None  # company_directory id, when the company is in the directory
     location: str
     description: Optional[str] = None
     url: str
     source: str
     posted_date: Optional[str] = None
     salary: Optional[str] = None
+    links: Optional[List[JobLink]] = None  # All sources when near-duplicate postings were merged
+    provider: Optional[str] = None  # JobSource that returned this job (google, local, fixture, ...)
+    match: Optional[JobMatch] = None  # Set when results were personalized for the caller
+    similarity: Optional[float] = None  # TF-IDF cosine for profile and similar-job matches
+    is_new: Optional[bool] = None  # Not shown to the signed-in user before
+    application_status: Optional[str] = None  # Status in the signed-in user's tracker (Saved, Applied, ...)
 
 class JobSearchRequest(BaseModel):
     query: str
     location: Optional[str] = None
-    limit: int = 10
-    start: int = 1
+    limit: int = Field(10, ge=1, le=100)
+    start: int = Field(1, ge=0)  # Legacy offset paging; prefer `cursor`
+    cursor: Optional[str] = None  # X-Next-Cursor from the previous /search page
     experience_level: Optional[List[str]] = None
     platforms: Optional[List[str]] = None
     company_size: Optional[List[str]] = None  # Added company size filter
+    personalize: bool = False  # Re-rank for the signed-in user's skills, experience and preferences
+
+class SavedSearchCreate(BaseModel):
+    query: str
+    location: Optional[str] = None
+    experience_level: Optional[List[str]] = []
+    platforms: Optional[List[str]] = []
+
+class SavedSearchResponse(SavedSearchCreate):
+    id: int
+    created_at: datetime
+    new_matches: int = 0
+
+    class Config:
+        from_attributes = True
 
 # User Schemas
 class UserBase(BaseModel):
@@ -0,0 +1,176 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from array import array
+from typing import List, Optional
+
+import facets
+import job_vectors
+from schemas import Job
+from search_index import InvertedIndex
+
+DEFAULT_FIXTURE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mock_jobs.ndjson")
+JOB_FIXTURE_PATH = os.getenv("JOB_FIXTURE_PATH", DEFAULT_FIXTURE_PATH)
+
+FIELDS = ("title", "company", "location", "description", "url", "source")
+_MAGIC = b"JOBCAT1\0"
+_HEADER = struct.Struct("<8sQQ")  # magic, rows, fields
+
+
+def _compile(ndjson_path: str, out_path: str):
+    """
+    Convert the NDJSON catalog into one columnar file: a header, a uint64
+    offset per (row, field) into a UTF-8 blob, then the blob itself.
+    Written to a temp file and renamed so concurrent workers never see a
+    half-written catalog.
+    """
+    offsets = array("Q", [0])
+    blob = bytearray()
+    rows = 0
+    with open(ndjson_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            for field in FIELDS:
+                blob += (record.get(field) or "").encode("utf-8")
+                offsets.append(len(blob))
+            rows += 1
+
+    directory = os.path.dirname(out_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, rows, len(FIELDS)))
+            offsets.tofile(out)
+            out.write(blob)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _compiled_path(ndjson_path: str) -> str:
+    """
+    The compiled catalog lives next to the NDJSON file, or in the temp dir
+    when that directory is read-only (e.g. serverless deployments).
+    """
+    candidate = ndjson_path + ".bin"
+    if os.access(os.path.dirname(candidate) or ".", os.W_OK):
+        return candidate
+    return os.path.join(tempfile.gettempdir(), os.path.basename(candidate))
+
+
+class FixtureCatalog:
+    """
+    Read-only job catalog backed by a memory-mapped columnar file.
+
+    The file is mapped read-only, so every worker process shares the same
+    page-cache pages. Rows are addressed by integer id and decoded only on
+    access; `Job` objects are built just for the rows a caller returns.
+    """
+
+    def __init__(self, ndjson_path: str = JOB_FIXTURE_PATH):
+        self.path = ndjson_path
+        compiled = _compiled_path(ndjson_path)
+        if not os.path.exists(compiled) or os.path.getmtime(compiled) < os.path.getmtime(ndjson_path):
+            _compile(ndjson_path, compiled)
+
+        with open(compiled, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, n_fields = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or n_fields != len(FIELDS):
+            raise ValueError(f"Unrecognized job catalog file: {compiled}")
+
+        offsets_start = _HEADER.size
+        offsets_end = offsets_start + (self.rows * n_fields + 1) * 8
+        self._offsets = memoryview(self._mm)[offsets_start:offsets_end].cast("Q")
+        self._blob_start = offsets_end
+        self._index: Optional[InvertedIndex] = None
+        self._facets: Optional[facets.BitmapIndex] = None
+        self._vectors: Optional[job_vectors.TfidfMatrix] = None
+        # Searches run in worker threads, so one thread builds each index and the rest wait for it
+        self._build_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def field(self, row: int, name: str) -> str:
+        i = row * len(FIELDS) + FIELDS.index(name)
+        start = self._blob_start + self._offsets[i]
+        end = self._blob_start + self._offsets[i + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def job(self, row: int, location: str = "") -> Job:
+        """Materialize one row; `location` overrides the row's default location."""
+        values = {name: self.field(row, name) for name in FIELDS}
+        values["location"] = location or values["location"]
+        return Job(id=f"fixture-{row}", **values)
+
+    def jobs(self, rows: List[int], location: str = "") -> List[Job]:
+        return [self.job(row, location) for row in rows]
+
+    @property
+    def index(self) -> InvertedIndex:
+        """BM25 index over title, company and description, built on first use."""
+        with self._build_lock:
+            if self._index is None:
+                index = InvertedIndex()
+                for row in range(self.rows):
+                    index.add(row, {
+                        "title": self.field(row, "title"),
+                        "company": self.field(row, "company"),
+                        "description": self.field(row, "description"),
+                    })
+                self._index = index
+        return self._index
+
+    @property
+    def facet_index(self) -> facets.BitmapIndex:
+        """Structured attributes of every row as bitmaps (rows are the slots), built on first use."""
+        with self._build_lock:
+            if self._facets is None:
+                index = facets.BitmapIndex()
+                for row in range(self.rows):
+                    index.add(row, facets.job_attributes(
+                        self.field(row, "title"),
+                        self.field(row, "company"),
+                        self.field(row, "description"),
+                        self.field(row, "location"),
+                        self.field(row, "url"),
+                        self.field(row, "source"),
+                    ))
+                index.filter({})  # Fold the buffered rows in now; the index is read-only from here
+                self._facets = index
+        return self._facets
+
+    @property
+    def vectors(self) -> job_vectors.TfidfMatrix:
+        """TF-IDF rows of every posting (rows are the slots), built on first use."""
+        with self._build_lock:
+            if self._vectors is None:
+                matrix = job_vectors.TfidfMatrix()
+                for row in range(self.rows):
+                    matrix.add(row, job_vectors.job_terms(self.field(row, "title"), self.field(row, "description")))
+                len(matrix)  # Fold the buffered rows in now; the matrix is read-only from here
+                self._vectors = matrix
+        return self._vectors
+
+
+_catalog: Optional[FixtureCatalog] = None
+
+
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> FixtureCatalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = FixtureCatalog()
+    return _catalog
@@ -1,21 +1,40 @@
 import os
-import requests
-from typing import List
+import asyncio
+import httpx
+from typing import List, Optional
 from dotenv import load_dotenv
 from schemas import Job
+from scrapers.throttle import SingleFlight
+import http_client
+import job_store
+from quota_usage import DailyQuota
+from dedup import dedupe_jobs, host_label
+from scrapers.fixture_catalog import get_catalog
+import facets
+from company_directory import directory
 
 load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 SEARCH_ENGINE_ID = os.getenv("SEARCH_ENGINE_ID")
 
-def search_jobs_google(query: str, location: str = "", start: int = 1, experience_level: List[str] = None, platforms: List[str] = None) -> List[Job]:
-    if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
-        print("Warning: Google API Key or Search Engine ID not found.")
-        print("Returning mock jobs as fallback...")
-        return _get_mock_jobs(query, location, start, experience_level, platforms)
+CSE_HOST = "www.googleapis.com"
+CSE_URL = f"https://{CSE_HOST}/customsearch/v1"
+CSE_REQUEST_DEADLINE = float(os.getenv("CSE_REQUEST_DEADLINE", "8.0"))  # Per page, retries included
+CSE_PAGE_SIZE = 10  # Custom Search returns at most 10 results per request
+CSE_MAX_RESULTS = 100  # Custom Search refuses start + num > 100
+CSE_DAILY_QUOTA = int(os.getenv("CSE_DAILY_QUOTA", "100"))  # Free tier: 100 queries/day
+CSE_BREAKER_FAILURES = int(os.getenv("CSE_BREAKER_FAILURES", "5"))
+CSE_BREAKER_RESET_SECONDS = float(os.getenv("CSE_BREAKER_RESET_SECONDS", "60"))
+CSE_QUOTA_BACKOFF_SECONDS = 3600  # How long to stop calling after a quota error
+
+# Every page request costs one query against the daily quota, counted in the database
+quota = DailyQuota("google_cse", CSE_DAILY_QUOTA)
+# The shared client's breaker for the Custom Search host, with the CSE thresholds
+breaker = http_client.client.configure_host(CSE_HOST, CSE_BREAKER_FAILURES, CSE_BREAKER_RESET_SECONDS)
+_inflight = SingleFlight()
 
-    # Build the search query
+def _build_search_query(query: str, location: str = "", experience_level: List[str] = None, platforms: List[str] = None) -> str:
     search_terms = [query, "jobs"]
     if location:
         search_terms.append(location)
@@ -48,451 +67,263 @@ def search_jobs_google(query: str, location: str = "", start: int = 1, experienc
         if site_filters:
             base_query += f" ({' OR '.join(site_filters)})"
 
-    search_query = base_query
-    url = "https://www.googleapis.com/customsearch/v1"
-    
+    return base_query
+
+def _parse_items(items: List[dict], location: str = "") -> List[Job]:
+    jobs = []
+    for item in items:
+        # Basic parsing - Google results are generic, so we map best effort
+        title = item.get("title", "Unknown Job")
+        snippet = item.get("snippet", "")
+        link = item.get("link", "")
+        
+        # Try to extract company from title if possible (e.g. "Software Engineer - Google" or "Job | Company")
+        company = "Unknown"
+        if " - " in title:
+            parts = title.split(" - ")
+            company = parts[-1].strip()
+            title = " - ".join(parts[:-1]).strip()
+        elif "|" in title:
+            parts = title.split("|")
+            company = parts[-1].strip()
+            title = "|".join(parts[:-1]).strip()
+        # "Google Careers", "Tech Mahindra Ltd" -> a directory company; the raw name is kept
+        known = directory.resolve(facets.employer(company, host_label(link)))
+
+        job = Job(
+            id=job_store.url_hash(link) if link else None,
+            title=title,
+            company=company,
+            company_id=known.id if known else None,
+            location=location or "", # Google doesn't always give location in structured way
+            description=snippet,
+            url=link,
+            source="Google Search"
+        )
+        jobs.append(job)
+    return jobs
+
+def _page_starts(start: int, limit: int) -> List[tuple]:
+    """Split a result window into (start, num) Custom Search page requests."""
+    start = max(start, 1)
+    end = min(start + max(limit, 1), CSE_MAX_RESULTS + 1)
+    pages = []
+    page_start = start
+    while page_start < end:
+        num = min(CSE_PAGE_SIZE, end - page_start)
+        pages.append((page_start, num))
+        page_start += num
+    return pages
+
+async def _fetch_page(search_query: str, start: int, num: int, location: str = "") -> List[Job]:
     params = {
         "key": GOOGLE_API_KEY,
         "cx": SEARCH_ENGINE_ID,
         "q": search_query,
-        "num": 10,  # Max 10 results per page
+        "num": num,
         "start": start
     }
+    # No retries: every upstream call spends a query, and only one is charged per page
+    response = await http_client.client.get(CSE_URL, params=params, deadline=CSE_REQUEST_DEADLINE, retries=0)
+    print(f"DEBUG: Page start={start} Response Status Code: {response.status_code}")
+    
+    if response.status_code != 200:
+        print(f"DEBUG: Error Response: {response.text}")
+    
+    response.raise_for_status()
+    data = response.json()
+
+    if "items" not in data:
+        print(f"DEBUG: No 'items' found in response data for start={start}.")
+        if "spelling" in data:
+            print(f"DEBUG: Spelling suggestion: {data['spelling']}")
+        if "error" in data:
+            print(f"DEBUG: Error in data: {data['error']}")
+        return []
+
+    print(f"DEBUG: Found {len(data['items'])} items at start={start}")
+    return _parse_items(data["items"], location)
+
+async def fetch_pages(search_query: str, location: str = "", start: int = 1, limit: int = 10) -> List[Job]:
+    """
+    Fetch `limit` results starting at `start` as concurrent Custom Search page
+    requests over the shared outbound client. Pages are merged in rank order; failed pages
+    are skipped so the caller still gets whatever the other pages returned.
+    Raises the first error only if every page failed.
+    """
+    pages = _page_starts(start, limit)
+    results = await asyncio.gather(
+        *(_fetch_page(search_query, page_start, num, location) for page_start, num in pages),
+        return_exceptions=True
+    )
+
+    jobs = []
+    errors = []
+    for (page_start, _), result in zip(pages, results):
+        if isinstance(result, Exception):
+            print(f"DEBUG: Page start={page_start} failed: {result}")
+            errors.append(result)
+        else:
+            jobs.extend(result)
+
+    if errors and len(errors) == len(pages):
+        raise errors[0]
+    return jobs
+
+def _is_quota_error(error: Exception) -> bool:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return False
+    code = error.response.status_code
+    return code == 429 or (code == 403 and "quota" in error.response.text.lower())
+
+def _fallback_jobs(query: str, location: str = "", start: int = 1, experience_level: List[str] = None, platforms: List[str] = None, limit: int = 10) -> List[Job]:
+    """Local results used whenever Custom Search is unavailable or out of quota."""
+    return _get_mock_jobs(query, location, start, experience_level, platforms, limit)
 
-    print(f"DEBUG: Searching Google with query: {search_query}")
+def is_configured() -> bool:
+    return bool(GOOGLE_API_KEY and SEARCH_ENGINE_ID)
+
+async def search_jobs_google(query: str, location: str = "", start: int = 1, experience_level: List[str] = None, platforms: List[str] = None, limit: int = 10, fallback: bool = True) -> List[Job]:
+    """
+    Search Custom Search for `limit` results from `start`. Unless `fallback`
+    is False, local mock results are returned when Google cannot answer.
+    """
+    def _fallback() -> List[Job]:
+        if not fallback:
+            return []
+        return _fallback_jobs(query, location, start, experience_level, platforms, limit)
+
+    if not is_configured():
+        print("Warning: Google API Key or Search Engine ID not found.")
+        print("Returning mock jobs as fallback...")
+        return _fallback()
+
+    # Fail fast to local results instead of waiting for an error or timeout. Only
+    # a check: the request itself claims the half-open probe in http_client
+    if breaker.is_open():
+        print(f"DEBUG: Custom Search circuit is {breaker.state}. Using local fallback.")
+        return _fallback()
+
+    search_query = _build_search_query(query, location, experience_level, platforms)
+
+    print(f"DEBUG: Searching Google with query: {search_query} (start={start}, limit={limit})")
     print(f"DEBUG: API Key present: {bool(GOOGLE_API_KEY)}")
     print(f"DEBUG: Engine ID present: {bool(SEARCH_ENGINE_ID)}")
 
+    key = (search_query, location or "", start, limit)
     try:
-        response = requests.get(url, params=params)
-        print(f"DEBUG: Response Status Code: {response.status_code}")
-        
-        if response.status_code != 200:
-            print(f"DEBUG: Error Response: {response.text}")
-        
-        response.raise_for_status()
-        data = response.json()
-        
-        # print(f"DEBUG: Full Response Data: {data}") # Uncomment if needed, but might be large
-
-        jobs = []
-        if "items" in data:
-            print(f"DEBUG: Found {len(data['items'])} items")
-            for item in data["items"]:
-                # Basic parsing - Google results are generic, so we map best effort
-                title = item.get("title", "Unknown Job")
-                snippet = item.get("snippet", "")
-                link = item.get("link", "")
-                
-                # Try to extract company from title if possible (e.g. "Software Engineer - Google" or "Job | Company")
-                company = "Unknown"
-                if " - " in title:
-                    parts = title.split(" - ")
-                    company = parts[-1].strip()
-                    title = " - ".join(parts[:-1]).strip()
-                elif "|" in title:
-                    parts = title.split("|")
-                    company = parts[-1].strip()
-                    title = "|".join(parts[:-1]).strip()
-
-                job = Job(
-                    title=title,
-                    company=company,
-                    location=location, # Google doesn't always give location in structured way
-                    description=snippet,
-                    url=link,
-                    source="Google Search"
-                )
-                jobs.append(job)
-        else:
-            print("DEBUG: No 'items' found in response data.")
-            if "spelling" in data:
-                print(f"DEBUG: Spelling suggestion: {data['spelling']}")
-            if "error" in data:
-                print(f"DEBUG: Error in data: {data['error']}")
+        jobs = await _inflight.do(key, lambda: _fetch_within_quota(search_query, location, start, limit))
         
         if not jobs:
             print("DEBUG: No jobs found from API. Switching to mock data.")
-            return _get_mock_jobs(query, location, start, experience_level, platforms)
+            return _fallback()
             
-        return jobs
+        return list(jobs)
 
     except Exception as e:
         print(f"Error searching Google: {e}")
         # Fallback to mock data on error
-        return _get_mock_jobs(query, location, start, experience_level, platforms)
+        return _fallback()
 
-def _calculate_relevance_score(job: Job, query: str, experience_level: List[str] = None) -> int:
-    """Calculate relevance score for a job based on query and filters"""
-    score = 0
-    query_lower = query.lower() if query else ""
-    
-    # Exact title match (highest priority)
-    if query_lower in job.title.lower():
-        score += 100
-    
-    # Partial title match
-    query_words = query_lower.split()
-    for word in query_words:
-        if len(word) > 2 and word in job.title.lower():
-            score += 50
-    
-    # Description match
-    if query_lower in job.description.lower():
-        score += 30
-    
-    # Company match
-    if query_lower in job.company.lower():
-        score += 20
-    
-    # Experience level match
-    if experience_level:
-        for exp in experience_level:
-            if exp.lower() in job.title.lower() or exp.lower() in job.description.lower():
-                score += 40
-    
-    return score
+async def _fetch_within_quota(search_query: str, location: str, start: int, limit: int) -> List[Job]:
+    """Run one (coalesced) upstream fetch, spending quota tokens and tripping the breaker on quota errors."""
+    pages = len(_page_starts(start, limit))
+    granted = await asyncio.to_thread(quota.acquire_up_to, pages)
+    if granted == 0:
+        print("DEBUG: Custom Search daily quota exhausted. Using local fallback.")
+        return []
+    if granted < pages:
+        print(f"DEBUG: Quota allows {granted} of {pages} pages.")
 
+    try:
+        jobs = await fetch_pages(search_query, location, start, min(limit, granted * CSE_PAGE_SIZE))
+    except Exception as e:
+        # Transport errors and 5xx already count against the host breaker
+        if _is_quota_error(e):
+            await asyncio.to_thread(quota.drain)
+            breaker.trip(CSE_QUOTA_BACKOFF_SECONDS)
+        raise
+
+    # Keep every real result in the local store for repeat and paginated searches
+    try:
+        stored = await asyncio.to_thread(job_store.ingest_jobs, jobs)
+        print(f"DEBUG: Stored {stored} jobs in local job store")
+    except Exception as e:
+        print(f"Failed to store jobs: {e}")
+
+    # Mirrors of one posting on several boards collapse into one result
+    return dedupe_jobs(jobs)
+
+def get_upstream_stats() -> dict:
+    return {
+        "quota": quota.stats(),
+        "circuit": breaker.stats(),
+        "coalescing": _inflight.stats(),
+    }
+
+def _mock_rows(query: str = "", experience_level: List[str] = None, platforms: List[str] = None, company_size: List[str] = None) -> List[int]:
+    """Fixture rows passing the filters, best first: BM25 matches, or every row if the query is too specific."""
+    catalog = get_catalog()
+    allowed = catalog.facet_index.filter(facets.filters_for(platforms, experience_level, company_size))
+    accept = None if allowed is None else facets.membership(allowed)
 
-def _get_mock_jobs(query: str = "", location: str = "", start: int = 1, experience_level: List[str] = None, platforms: List[str] = None) -> List[Job]:
-    print(f"DEBUG: Returning mock jobs for query='{query}', location='{location}', start={start}")
-    
-    # Expanded and more diverse mock job listings (50+ jobs for better search results)
-    all_mock_jobs = [
-        # Software Engineering Jobs
-        Job(
-            title="Senior Software Engineer",
-            company="Tech Corp",
-            location=location or "Remote",
-            description="We are looking for a senior developer with Python, React, and TypeScript experience. Software development role with competitive salary and benefits. Work on cutting-edge projects.",
-            url="https://www.linkedin.com/jobs/search/?keywords=software%20engineer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Software Engineer",
-            company="StartupHub",
-            location=location or "San Francisco, CA",
-            description="Join our engineering team to build scalable web applications. Looking for software engineers with JavaScript, Python, or Java skills. Great for mid-level developers.",
-            url="https://www.indeed.com/jobs?q=software+engineer",
-            source="Indeed"
-        ),
-        Job(
-            title="Junior Software Developer",
-            company="CodeFactory",
-            location=location or "Austin, TX",
-            description="Entry-level software developer position. Perfect for freshers and recent graduates. Training provided in modern web development technologies.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=junior%20software%20developer",
-            source="Glassdoor"
-        ),
-        
-        # Frontend Development
-        Job(
-            title="Frontend Developer",
-            company="Startup Inc",
-            location=location or "Bangalore",
-            description="Looking for a frontend developer with React, Vue.js, or Angular skills. Build beautiful user interfaces. Position for freshers and experienced developers.",
-            url="https://www.naukri.com/frontend-developer-jobs",
-            source="Naukri"
-        ),
-        Job(
-            title="Senior Frontend Engineer",
-            company="WebMasters",
-            location=location or "New York, NY",
-            description="Lead frontend development with React, Next.js, and TypeScript. Senior position with 5+ years experience required. Competitive compensation.",
-            url="https://www.linkedin.com/jobs/search/?keywords=frontend%20engineer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="React Developer",
-            company="ReactPros",
-            location=location or "Remote",
-            description="Specialized React developer role. Build modern SPAs with React, Redux, and hooks. Mid to senior level position.",
-            url="https://www.indeed.com/jobs?q=react+developer",
-            source="Indeed"
-        ),
-        
-        # Backend Development
-        Job(
-            title="Backend Developer",
-            company="API Masters",
-            location=location or "Chicago, IL",
-            description="Build scalable REST APIs and microservices. Backend development role with Node.js, Python, or Java. Experience with databases required.",
-            url="https://www.indeed.com/jobs?q=backend+developer",
-            source="Indeed"
-        ),
-        Job(
-            title="Python Backend Engineer",
-            company="PythonWorks",
-            location=location or "Seattle, WA",
-            description="Backend engineer specializing in Python, FastAPI, and Django. Build robust APIs and services. Mid-level position.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=python%20backend",
-            source="Glassdoor"
-        ),
-        Job(
-            title="Node.js Developer",
-            company="NodeExperts",
-            location=location or "Boston, MA",
-            description="Node.js backend developer for building scalable applications. Experience with Express, MongoDB, and microservices architecture.",
-            url="https://www.linkedin.com/jobs/search/?keywords=nodejs%20developer",
-            source="LinkedIn"
-        ),
-        
-        # Full Stack
-        Job(
-            title="Full Stack Developer",
-            company="WebTech Solutions",
-            location=location or "Austin, TX",
-            description="Build modern web applications using MERN stack (MongoDB, Express, React, Node.js). Full stack development role for experienced developers.",
-            url="https://www.linkedin.com/jobs/search/?keywords=full%20stack%20developer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Full Stack Engineer",
-            company="TechVentures",
-            location=location or "Remote",
-            description="Full stack engineer with expertise in both frontend and backend. Work with React, Python, PostgreSQL, and AWS.",
-            url="https://www.indeed.com/jobs?q=full+stack+engineer",
-            source="Indeed"
-        ),
-        
-        # Data Science & ML
-        Job(
-            title="Data Scientist",
-            company="Data AI",
-            location=location or "San Francisco, CA",
-            description="Analyze large datasets and build predictive models. Data science role with Python, Pandas, and machine learning experience required.",
-            url="https://www.indeed.com/jobs?q=data+scientist",
-            source="Indeed"
-        ),
-        Job(
-            title="Machine Learning Engineer",
-            company="AI Innovations",
-            location=location or "Boston, MA",
-            description="Develop ML models and deploy them to production. Machine learning role with TensorFlow, PyTorch, and Python expertise.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=machine%20learning%20engineer",
-            source="Glassdoor"
-        ),
-        Job(
-            title="Data Analyst",
-            company="Analytics Pro",
-            location=location or "Denver, CO",
-            description="Transform data into actionable insights. Data analysis position with SQL, Tableau, and Excel experience. Entry to mid-level.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=data%20analyst",
-            source="Glassdoor"
-        ),
-        Job(
-            title="AI Research Scientist",
-            company="DeepMind Labs",
-            location=location or "London, UK",
-            description="Conduct cutting-edge AI research. PhD preferred. Work on neural networks, NLP, and computer vision projects.",
-            url="https://www.linkedin.com/jobs/search/?keywords=ai%20research",
-            source="LinkedIn"
-        ),
-        
-        # DevOps & Cloud
-        Job(
-            title="DevOps Engineer",
-            company="Cloud Systems",
-            location=location or "Seattle, WA",
-            description="Manage cloud infrastructure and CI/CD pipelines. DevOps position with AWS, Docker, Kubernetes, and Terraform experience.",
-            url="https://www.indeed.com/jobs?q=devops+engineer",
-            source="Indeed"
-        ),
-        Job(
-            title="Cloud Architect",
-            company="CloudTech Inc",
-            location=location or "Dallas, TX",
-            description="Design and implement cloud solutions on AWS, Azure, or GCP. Cloud architecture role for experienced professionals with 7+ years.",
-            url="https://www.linkedin.com/jobs/search/?keywords=cloud%20architect",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Site Reliability Engineer",
-            company="ReliableOps",
-            location=location or "Remote",
-            description="Ensure system reliability and performance. SRE role with Linux, monitoring tools, and automation experience.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=sre",
-            source="Glassdoor"
-        ),
-        
-        # Mobile Development
-        Job(
-            title="Mobile Developer",
-            company="AppWorks",
-            location=location or "Miami, FL",
-            description="Build native mobile apps for iOS and Android. Mobile development role with React Native, Flutter, or native development experience.",
-            url="https://www.naukri.com/mobile-developer-jobs",
-            source="Naukri"
-        ),
-        Job(
-            title="iOS Developer",
-            company="AppleDevs",
-            location=location or "Cupertino, CA",
-            description="Native iOS development with Swift and SwiftUI. Build amazing iPhone and iPad applications.",
-            url="https://www.linkedin.com/jobs/search/?keywords=ios%20developer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Android Developer",
-            company="DroidMasters",
-            location=location or "Mountain View, CA",
-            description="Android app development with Kotlin and Java. Work on popular Android applications with millions of users.",
-            url="https://www.indeed.com/jobs?q=android+developer",
-            source="Indeed"
-        ),
-        
-        # Product & Design
-        Job(
-            title="Product Manager",
-            company="Innovation Labs",
-            location=location or "New York, NY",
-            description="Lead our product team to build the next generation of AI tools. Product management position with technical background preferred.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=product%20manager",
-            source="Glassdoor"
-        ),
-        Job(
-            title="UI/UX Designer",
-            company="Design Studio",
-            location=location or "Los Angeles, CA",
-            description="Create beautiful and intuitive user interfaces. Design position for creative minds with Figma and Adobe XD experience.",
-            url="https://www.linkedin.com/jobs/search/?keywords=ui%20ux%20designer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Product Designer",
-            company="DesignFirst",
-            location=location or "San Francisco, CA",
-            description="End-to-end product design from research to implementation. Work closely with engineering teams.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=product%20designer",
-            source="Glassdoor"
-        ),
-        
-        # QA & Testing
-        Job(
-            title="QA Engineer",
-            company="Quality First",
-            location=location or "Portland, OR",
-            description="Ensure software quality through automated testing. QA testing position with Selenium, Jest, and Cypress experience.",
-            url="https://www.indeed.com/jobs?q=qa+engineer",
-            source="Indeed"
-        ),
-        Job(
-            title="Test Automation Engineer",
-            company="AutoTest Inc",
-            location=location or "Austin, TX",
-            description="Build and maintain automated test frameworks. Expertise in test automation tools and CI/CD integration.",
-            url="https://www.linkedin.com/jobs/search/?keywords=test%20automation",
-            source="LinkedIn"
-        ),
-        
-        # Security
-        Job(
-            title="Cybersecurity Analyst",
-            company="SecureNet",
-            location=location or "Washington, DC",
-            description="Protect systems from cyber threats and vulnerabilities. Cybersecurity position with CISSP or CEH certification preferred.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=cybersecurity%20analyst",
-            source="Glassdoor"
-        ),
-        Job(
-            title="Security Engineer",
-            company="CyberDefense",
-            location=location or "Remote",
-            description="Implement security measures and conduct penetration testing. Experience with security tools and frameworks required.",
-            url="https://www.indeed.com/jobs?q=security+engineer",
-            source="Indeed"
-        ),
-        
-        # Business & Analytics
-        Job(
-            title="Business Analyst",
-            company="Enterprise Solutions",
-            location=location or "Atlanta, GA",
-            description="Bridge the gap between business and technology. Business analysis role with Agile methodology and requirements gathering experience.",
-            url="https://www.linkedin.com/jobs/search/?keywords=business%20analyst",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Technical Writer",
-            company="DocuTech",
-            location=location or "Remote",
-            description="Create technical documentation and user guides. Strong writing skills and technical understanding required.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=technical%20writer",
-            source="Glassdoor"
-        ),
-        
-        # Specialized Roles
-        Job(
-            title="Blockchain Developer",
-            company="CryptoTech",
-            location=location or "Remote",
-            description="Develop blockchain applications and smart contracts. Experience with Solidity, Ethereum, or other blockchain platforms.",
-            url="https://www.linkedin.com/jobs/search/?keywords=blockchain%20developer",
-            source="LinkedIn"
-        ),
-        Job(
-            title="Game Developer",
-            company="GameStudio",
-            location=location or "Los Angeles, CA",
-            description="Create engaging video games with Unity or Unreal Engine. Game development role for passionate developers.",
-            url="https://www.indeed.com/jobs?q=game+developer",
-            source="Indeed"
-        ),
-        Job(
-            title="Embedded Systems Engineer",
-            company="IoT Solutions",
-            location=location or "San Jose, CA",
-            description="Develop embedded software for IoT devices. C/C++ programming and hardware knowledge required.",
-            url="https://www.glassdoor.com/Job/jobs.htm?sc.keyword=embedded%20engineer",
-            source="Glassdoor"
-        ),
-    ]
-
-    # Smart filtering based on query
-    filtered_jobs = all_mock_jobs
-    
     # Apply query-based filtering with relevance scoring
     if query and query.strip():
-        # Calculate relevance scores for all jobs
-        scored_jobs = [
-            (job, _calculate_relevance_score(job, query, experience_level))
-            for job in all_mock_jobs
-        ]
-        
-        # Filter jobs with score > 0 and sort by relevance
-        relevant_jobs = [job for job, score in scored_jobs if score > 0]
-        relevant_jobs.sort(
-            key=lambda job: _calculate_relevance_score(job, query, experience_level),
-            reverse=True
-        )
-        
+        # Rank with BM25 over the postings of the query terms only
+        ranked = catalog.index.search(query, extra_terms=experience_level, accept=accept)
+        relevant_rows = [row for row, _ in ranked]
+
         # Use relevant jobs if we have enough results
-        if len(relevant_jobs) >= 5:
-            filtered_jobs = relevant_jobs
-        else:
-            # Fallback to all jobs if query is too specific
-            print(f"DEBUG: Query too specific, showing all jobs. Relevant: {len(relevant_jobs)}")
-    
-    # Filter by platform if specified
-    if platforms and "All" not in platforms:
-        platform_filtered = [
-            job for job in filtered_jobs 
-            if any(p.lower() in job.source.lower() for p in platforms)
-        ]
-        if len(platform_filtered) >= 3:
-            filtered_jobs = platform_filtered
-        else:
-            print(f"DEBUG: Platform filter too restrictive, keeping all results")
+        if len(relevant_rows) >= 5:
+            return relevant_rows
+        # Fallback to all jobs if query is too specific
+        print(f"DEBUG: Query too specific, showing all jobs. Relevant: {len(relevant_rows)}")
 
-    # Filter by experience level if specified (already considered in relevance scoring)
-    # We don't need additional filtering here as it's part of the score
+    return list(range(len(catalog))) if allowed is None else facets.slots_of(allowed)
 
-    # Implement pagination: return 10 jobs per page
-    page_size = 10
+def _get_mock_jobs(query: str = "", location: str = "", start: int = 1, experience_level: List[str] = None, platforms: List[str] = None, limit: int = 10, company_size: List[str] = None) -> List[Job]:
+    print(f"DEBUG: Returning mock jobs for query='{query}', location='{location}', start={start}")
+    
+    # Offline catalog (data/mock_jobs.ndjson or JOB_FIXTURE_PATH), memory-mapped and shared.
+    # Platform, experience and company size filters are exact bitmap intersections.
+    filtered_rows = _mock_rows(query, experience_level, platforms, company_size)
+
+    # Implement pagination: return `limit` jobs per page
+    page_size = max(limit, 1)
+    start = max(start, 1)
     start_index = start - 1  # start is 1-indexed from API
     end_index = start_index + page_size
     
-    paginated_jobs = filtered_jobs[start_index:end_index]
+    # Only the returned page is materialized as Job objects
+    paginated_jobs = get_catalog().jobs(filtered_rows[start_index:end_index], location)
     
-    print(f"DEBUG: Query='{query}', Total filtered: {len(filtered_jobs)}, Page {(start-1)//10 + 1}: {len(paginated_jobs)} jobs")
+    print(f"DEBUG: Query='{query}', Total filtered: {len(filtered_rows)}, Page {(start-1)//page_size + 1}: {len(paginated_jobs)} jobs")
     return paginated_jobs
+
+def _mock_facet_counts(query: str = "", filters: dict = None) -> tuple:
+    """(total, per-facet value counts) for the fixture rows `_get_mock_jobs` would page through."""
+    catalog = get_catalog()
+    filters = filters or {}
+    candidates = facets.bitmap_of(_mock_rows(query)) if query and query.strip() else facets.bitmap_of(range(len(catalog)))
+    allowed = catalog.facet_index.filter(filters)
+    total = (candidates if allowed is None else candidates & allowed).bit_count()
+    return total, catalog.facet_index.counts(candidates, filters)
+
+
+def _mock_profile_matches(terms: dict, location: str = "", limit: int = 20) -> List[tuple]:
+    """(job, cosine) for the fixture rows closest to a profile, best first."""
+    catalog = get_catalog()
+    vectors = catalog.vectors
+    ranked = vectors.top_k(vectors.query_vector(terms), limit)
+    return [(catalog.job(row, location), score) for row, score in ranked]
+
+
+def _mock_similar_jobs(row: int, limit: int = 10) -> Optional[List[tuple]]:
+    """(job, cosine) for the fixture rows most like `row`; None if there is no such row."""
+    catalog = get_catalog()
+    vectors = catalog.vectors
+    vector = vectors.row_vector(row)
+    if vector is None:
+        return None
+    ranked = vectors.top_k(vector, limit, accept=lambda other: other != row, min_score=0.1)
+    return [(catalog.job(other), score) for other, score in ranked]
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls: the first caller for a key runs the
+    coroutine, everyone arriving before it finishes awaits the same result.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.followers}
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker. After `failure_threshold`
+    consecutive failures calls are rejected without touching the upstream
+    until `reset_timeout` has passed; then one trial call is let through
+    and the rest are rejected until it records a success or failure. A
+    probe that never reports back (e.g. a cancelled request) stops blocking
+    after another `reset_timeout`, and the next call becomes the probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._open_for = reset_timeout
+        self._probe_started = None
+        self.rejected = 0
+
+    def is_open(self) -> bool:
+        """Whether allow() would reject a call now, without claiming the half-open probe."""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            return now - self._opened_at < self._open_for
+        if self.state == self.HALF_OPEN:
+            return self._probe_started is not None and now - self._probe_started < self.reset_timeout
+        return False
+
+    def allow(self) -> bool:
+        if self.is_open():
+            self.rejected += 1
+            return False
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self._probe_started = time.monotonic()
+        return True
+
+    def release(self):
+        """Give up the half-open probe without an outcome, so the next call can probe."""
+        self._probe_started = None
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, open_for: float = None):
+        """Open the circuit now, optionally for longer than the default reset timeout."""
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._open_for = open_for if open_for is not None else self.reset_timeout
+        self._probe_started = None
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "probe_in_flight": self._probe_started is not None,
+            "rejected": self.rejected,
+        }
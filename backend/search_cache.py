@@ -0,0 +1,155 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+from schemas import Job, JobSearchRequest
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "512"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "900"))  # Fresh for 15 minutes
+SEARCH_CACHE_STALE_TTL = int(os.getenv("SEARCH_CACHE_STALE_TTL", "3600"))  # Then served stale for up to 1 hour
+SEARCH_CACHE_DEGRADED_TTL = int(os.getenv("SEARCH_CACHE_DEGRADED_TTL", "60"))  # Results missing a source
+
+
+def _norm_text(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _norm_list(values: Optional[List[str]]) -> Tuple[str, ...]:
+    if not values:
+        return ()
+    return tuple(sorted({_norm_text(v) for v in values if v and v.strip()}))
+
+
+# A fetch returns the jobs, or (jobs, ttl) to cache them for less than the default TTL,
+# or (jobs, ttl, raw_count) to also record how many results the sources returned before dedupe
+FetchResult = Union[List[Job], Tuple[List[Job], Optional[int]], Tuple[List[Job], Optional[int], int]]
+
+
+def make_key(request: JobSearchRequest) -> tuple:
+    """
+    Canonical cache key for a search: case, whitespace and filter order
+    do not matter, so "React  Developer" + ["MNC", "Startup"] and
+    "react developer" + ["Startup", "MNC"] share an entry.
+    """
+    platforms = _norm_list(request.platforms)
+    if "all" in platforms:
+        platforms = ()
+    return (
+        _norm_text(request.query),
+        _norm_text(request.location),
+        _norm_list(request.experience_level),
+        platforms,
+        _norm_list(request.company_size),
+        request.start,
+        request.limit,
+    )
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of search results with a TTL.
+
+    Entries younger than `ttl` are fresh. Entries between `ttl` and
+    `ttl + stale_ttl` are served immediately while a single background
+    task refreshes them (stale-while-revalidate). Older entries are misses.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE, ttl: int = SEARCH_CACHE_TTL, stale_ttl: int = SEARCH_CACHE_STALE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[tuple, Tuple[float, float, List[Job], Optional[int]]]" = OrderedDict()
+        self._refreshing = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self, key: tuple) -> Tuple[Optional[List[Job]], bool]:
+        """Return (jobs, is_stale); jobs is None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        stored_at, ttl, jobs, _ = entry
+        age = time.monotonic() - stored_at
+        if age >= ttl + self.stale_ttl:
+            del self._entries[key]
+            return None, False
+        self._entries.move_to_end(key)
+        return jobs, age >= ttl
+
+    def set(self, key: tuple, jobs: List[Job], ttl: Optional[float] = None, raw_count: Optional[int] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (time.monotonic(), ttl, jobs, raw_count)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def raw_count(self, key: tuple) -> Optional[int]:
+        """Results the sources returned for a cached entry before dedupe, if it was recorded."""
+        entry = self._entries.get(key)
+        return entry[3] if entry is not None else None
+
+    def invalidate(self, key: Optional[tuple] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _store(self, key: tuple, result: FetchResult) -> List[Job]:
+        if not isinstance(result, tuple):
+            result = (result,)
+        jobs, ttl, raw_count = (result + (None, None))[:3]
+        self.set(key, jobs, ttl, raw_count)
+        return jobs
+
+    async def get_or_fetch(self, key: tuple, fetch: Callable[[], Awaitable[FetchResult]]) -> List[Job]:
+        jobs, is_stale = self.get(key)
+        if jobs is None:
+            self.misses += 1
+            return self._store(key, await fetch())
+
+        if is_stale:
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                self._refreshing.add(key)
+                asyncio.create_task(self._refresh(key, fetch))
+        else:
+            self.hits += 1
+        return jobs
+
+    async def _refresh(self, key: tuple, fetch: Callable[[], Awaitable[FetchResult]]):
+        try:
+            self._store(key, await fetch())
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_errors += 1
+            print(f"Search cache refresh failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._refreshing),
+        }
+
+
+# Process-wide cache used by POST /search
+cache = SearchCache()
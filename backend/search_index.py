@@ -0,0 +1,205 @@
+import heapq
+import math
+import re
+from array import array
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Keep "c++", "c#", "node.js" and "ci/cd" as single tokens
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./]*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "our", "the", "to", "we", "with", "you", "your",
+}
+
+DEFAULT_FIELD_BOOSTS = {"title": 3.0, "company": 1.5, "description": 1.0}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.rstrip("./")
+        if not token or token in _STOPWORDS:
+            continue
+        # Light plural folding so "developers" matches "developer"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index ranked with BM25F.
+
+    Each document has a few text fields with per-field boosts. Postings map
+    term -> (doc slots, packed per-field term frequencies) stored in flat
+    arrays, so a query only touches the postings of its own terms and a
+    100k-job corpus costs a few bytes per posting. Documents can be added,
+    replaced and removed one at a time as jobs are ingested; removed slots
+    are skipped and compacted away once they dominate.
+    """
+
+    def __init__(self, field_boosts: Dict[str, float] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_boosts = dict(field_boosts or DEFAULT_FIELD_BOOSTS)
+        self.fields = list(self.field_boosts)
+        self.k1 = k1
+        self.b = b
+        # Term frequencies of all fields are packed into one 32-bit value
+        self._tf_bits = 32 // len(self.fields)
+        self._tf_max = (1 << self._tf_bits) - 1
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._slot_of: Dict[Hashable, int] = {}
+        self._doc_ids: List[Optional[Hashable]] = []  # slot -> doc id, None once removed
+        self._lengths = [array("I") for _ in self.fields]  # per field: slot -> token count
+        self._total_lengths = [0] * len(self.fields)
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._slot_of
+
+    def add(self, doc_id: Hashable, fields: Dict[str, Optional[str]]):
+        """Index (or re-index) one document."""
+        if doc_id in self._slot_of:
+            self.remove(doc_id)
+
+        slot = len(self._doc_ids)
+        counts: Dict[str, int] = {}
+        for i, name in enumerate(self.fields):
+            tokens = tokenize(fields.get(name))
+            self._lengths[i].append(len(tokens))
+            self._total_lengths[i] += len(tokens)
+            shift = i * self._tf_bits
+            for token in tokens:
+                packed = counts.get(token, 0)
+                if (packed >> shift) & self._tf_max < self._tf_max:
+                    packed += 1 << shift
+                counts[token] = packed
+
+        for term, packed in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(slot)
+            postings[1].append(packed)
+        self._doc_ids.append(doc_id)
+        self._slot_of[doc_id] = slot
+
+    def remove(self, doc_id: Hashable):
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return
+        self._doc_ids[slot] = None
+        for i in range(len(self.fields)):
+            self._total_lengths[i] -= self._lengths[i][slot]
+        self._dead += 1
+        if self._dead > 1024 and self._dead > len(self._slot_of):
+            self._compact()
+
+    def _compact(self):
+        """Drop removed slots from every posting list and renumber the live ones, so per-slot arrays shrink too."""
+        new_slot: Dict[int, int] = {}
+        doc_ids = []
+        lengths = [array("I") for _ in self.fields]
+        for slot, doc_id in enumerate(self._doc_ids):
+            if doc_id is None:
+                continue
+            new_slot[slot] = len(doc_ids)
+            doc_ids.append(doc_id)
+            for i in range(len(self.fields)):
+                lengths[i].append(self._lengths[i][slot])
+        for term in list(self._postings):
+            slots, tfs = self._postings[term]
+            keep = [i for i, slot in enumerate(slots) if slot in new_slot]
+            if keep:
+                self._postings[term] = (array("I", (new_slot[slots[i]] for i in keep)), array("I", (tfs[i] for i in keep)))
+            else:
+                del self._postings[term]
+        self._doc_ids = doc_ids
+        self._lengths = lengths
+        self._slot_of = {doc_id: slot for slot, doc_id in enumerate(doc_ids)}
+        self._dead = 0
+
+    def docs_matching(self, text: str) -> set:
+        """Doc ids containing every term of `text` (e.g. a phrase like "Mid Level")."""
+        slots = None
+        for term in tokenize(text):
+            postings = self._postings.get(term)
+            term_slots = set(postings[0]) if postings else set()
+            slots = term_slots if slots is None else slots & term_slots
+            if not slots:
+                return set()
+        doc_ids = self._doc_ids
+        return {doc_ids[slot] for slot in slots or () if doc_ids[slot] is not None}
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        extra_terms: Iterable[str] = None,
+        extra_weight: float = 0.3,
+        accept: Callable[[Hashable], bool] = None,
+        match_all: bool = False,
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Rank documents containing any query term, best first.
+
+        `extra_terms` (e.g. experience levels) add to the score at
+        `extra_weight`; `accept` filters candidate doc ids before ranking;
+        `match_all` keeps only documents containing every query term.
+        """
+        n_docs = len(self._slot_of)
+        if not n_docs:
+            return []
+
+        weighted_terms: Dict[str, float] = {}
+        for term in tokenize(query):
+            weighted_terms[term] = 1.0
+        required = [term for term in weighted_terms] if match_all else []
+        for text in extra_terms or ():
+            for term in tokenize(text):
+                weighted_terms.setdefault(term, extra_weight)
+
+        avg_lengths = [max(total / n_docs, 1.0) for total in self._total_lengths]
+        field_params = [
+            (i * self._tf_bits, self.field_boosts[name], self._lengths[i], avg_lengths[i])
+            for i, name in enumerate(self.fields)
+        ]
+        doc_ids = self._doc_ids
+        tf_max = self._tf_max
+        k1, b = self.k1, self.b
+        scores: Dict[int, float] = {}
+        rejected = set()
+
+        for term, weight in weighted_terms.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings[0])
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for slot, packed in zip(*postings):
+                doc_id = doc_ids[slot]
+                if doc_id is None or slot in rejected:
+                    continue
+                if accept is not None and slot not in scores and not accept(doc_id):
+                    rejected.add(slot)
+                    continue
+                tf = 0.0
+                for shift, boost, lengths, avg_length in field_params:
+                    count = (packed >> shift) & tf_max
+                    if count:
+                        tf += boost * count / (1 - b + b * lengths[slot] / avg_length)
+                scores[slot] = scores.get(slot, 0.0) + weight * idf * tf / (k1 + tf)
+
+        for term in required:
+            postings = self._postings.get(term)
+            present = set(postings[0]) if postings else set()
+            scores = {slot: score for slot, score in scores.items() if slot in present}
+
+        if limit is None:
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(doc_ids[slot], score) for slot, score in ranked]
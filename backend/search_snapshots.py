@@ -0,0 +1,110 @@
+import base64
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from schemas import Job, JobSearchRequest
+
+SEARCH_SNAPSHOT_TTL = int(os.getenv("SEARCH_SNAPSHOT_TTL", "1800"))  # 30 minutes of "Show more"
+SEARCH_SNAPSHOT_MAX = int(os.getenv("SEARCH_SNAPSHOT_MAX", "2000"))
+SEARCH_SNAPSHOT_DEPTH = int(os.getenv("SEARCH_SNAPSHOT_DEPTH", "30"))  # Results ranked up front per search
+
+
+class CursorExpired(Exception):
+    """The cursor is malformed or its snapshot has expired (or lives on another worker)."""
+
+
+class CursorForbidden(Exception):
+    """The cursor's snapshot was created for another user (or for a signed-out search)."""
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{snapshot_id}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        snapshot_id, offset = base64.urlsafe_b64decode(padded.encode()).decode().rsplit(":", 1)
+        return snapshot_id, int(offset)
+    except Exception:
+        raise CursorExpired("Invalid cursor")
+
+
+class Snapshot:
+    def __init__(self, request: JobSearchRequest, jobs: List[Job], exhausted: bool, user_id: Optional[int] = None, fetched: Optional[int] = None):
+        self.request = request  # The search that produced the ranking, used to extend it
+        self.jobs = jobs
+        self.exhausted = exhausted  # True once the sources returned fewer results than asked for
+        self.user_id = user_id  # Who may page through it (None: signed-out searches)
+        # Upstream offset of the next window: results the sources returned, not what survived dedupe
+        self.next_start = request.start + (len(jobs) if fetched is None else fetched)
+        self.created_at = time.monotonic()
+        self.seen = {job.id or job.url for job in jobs}
+
+    def extend(self, jobs: List[Job], requested: int, fetched: Optional[int] = None):
+        """
+        Append the next ranked window, skipping anything already in the
+        snapshot. `fetched` is how many results the sources returned for
+        it before dedupe; fewer than `requested` means they have no more.
+        """
+        fetched = len(jobs) if fetched is None else fetched
+        for job in jobs:
+            key = job.id or job.url
+            if key not in self.seen:
+                self.seen.add(key)
+                self.jobs.append(job)
+        self.next_start += fetched
+        if fetched < requested:
+            self.exhausted = True
+
+
+class SnapshotStore:
+    """
+    Ranked result snapshots addressed by opaque cursors.
+
+    The first page of a search stores the whole ranked list; later pages
+    are slices of it, so "Show more" costs no upstream calls and results
+    never shift between pages. Snapshots are per process and expire after
+    `ttl` seconds; an unknown cursor raises CursorExpired and the client
+    starts a new search. Only the user who started the search can page
+    through it (CursorForbidden otherwise).
+    """
+
+    def __init__(self, ttl: int = SEARCH_SNAPSHOT_TTL, max_entries: int = SEARCH_SNAPSHOT_MAX):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+
+    def create(self, request: JobSearchRequest, jobs: List[Job], exhausted: bool, user_id: Optional[int] = None, fetched: Optional[int] = None) -> str:
+        snapshot_id = secrets.token_urlsafe(12)
+        self._snapshots[snapshot_id] = Snapshot(request, list(jobs), exhausted, user_id, fetched)
+        while len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, snapshot_id: str, user_id: Optional[int] = None) -> Snapshot:
+        """The snapshot behind a cursor, if it is still live and `user_id` created it."""
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None or time.monotonic() - snapshot.created_at >= self.ttl:
+            self._snapshots.pop(snapshot_id, None)
+            raise CursorExpired("Search results expired, please search again")
+        if snapshot.user_id != user_id:
+            # Personalized snapshots carry the creator's profile matches
+            raise CursorForbidden("These search results belong to another user")
+        return snapshot
+
+    def page(self, snapshot_id: str, offset: int, limit: int, user_id: Optional[int] = None) -> Tuple[List[Job], Optional[str]]:
+        """Slice a page and return it with the cursor of the following page (None at the end)."""
+        snapshot = self.get(snapshot_id, user_id)
+        jobs = snapshot.jobs[offset:offset + limit]
+        next_offset = offset + len(jobs)
+        has_more = next_offset < len(snapshot.jobs) or not snapshot.exhausted
+        next_cursor = encode_cursor(snapshot_id, next_offset) if jobs and has_more else None
+        return jobs, next_cursor
+
+
+# Process-wide snapshot store used by POST /search
+store = SnapshotStore()
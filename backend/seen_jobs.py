@@ -0,0 +1,151 @@
+import hashlib
+import math
+import os
+import struct
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+SEEN_FALSE_POSITIVE_RATE = float(os.getenv("SEEN_FALSE_POSITIVE_RATE", "0.005"))  # Per stage
+SEEN_INITIAL_CAPACITY = int(os.getenv("SEEN_INITIAL_CAPACITY", "256"))  # Jobs in the first stage
+SEEN_MAX_STAGE_CAPACITY = int(os.getenv("SEEN_MAX_STAGE_CAPACITY", "2048"))
+SEEN_MAX_BYTES = int(os.getenv("SEEN_MAX_BYTES", "12288"))  # Oldest stages are dropped past this
+
+_MAGIC = b"SBF1"
+_HEADER = struct.Struct("<4sB")  # magic, stages
+_STAGE = struct.Struct("<IIIB")  # capacity, count, bits, hashes
+
+
+def _positions(key: str, bits: int, hashes: int) -> List[int]:
+    """Bit positions of a key by double hashing two 64-bit halves of one digest."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BloomStage:
+    def __init__(self, capacity: int, error_rate: float = SEEN_FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.count = 0
+        self.bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.array[p >> 3] >> (p & 7) & 1 for p in _positions(key, self.bits, self.hashes))
+
+    def add(self, key: str):
+        for p in _positions(key, self.bits, self.hashes):
+            self.array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """
+    A set of job keys in a few kilobytes, with no false negatives and a
+    small chance (SEEN_FALSE_POSITIVE_RATE per stage) that an unseen job
+    reads as seen.
+
+    Keys go into the newest stage; when it is full a new stage twice as
+    large (up to SEEN_MAX_STAGE_CAPACITY) is started. Past SEEN_MAX_BYTES
+    the oldest stage is dropped, so jobs seen long ago can read as new
+    again. Stored jobs expire after a few days, so that window is ample.
+    """
+
+    def __init__(self, stages: List[BloomStage] = None):
+        self.stages = stages or []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in stage for stage in self.stages)
+
+    def __len__(self) -> int:
+        return sum(stage.count for stage in self.stages)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(stage.array) for stage in self.stages)
+
+    def add(self, key: str) -> bool:
+        """Add a key. True if it was not (apparently) in the set."""
+        if key in self:
+            return False
+        if not self.stages or self.stages[-1].full:
+            capacity = min(self.stages[-1].capacity * 2, SEEN_MAX_STAGE_CAPACITY) if self.stages else SEEN_INITIAL_CAPACITY
+            self.stages.append(BloomStage(capacity))
+            while len(self.stages) > 1 and self.nbytes > SEEN_MAX_BYTES:
+                self.stages.pop(0)
+        self.stages[-1].add(key)
+        return True
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(_MAGIC, len(self.stages))]
+        for stage in self.stages:
+            parts.append(_STAGE.pack(stage.capacity, stage.count, stage.bits, stage.hashes))
+            parts.append(bytes(stage.array))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> "ScalableBloomFilter":
+        if not data:
+            return cls()
+        magic, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            return cls()
+        offset = _HEADER.size
+        stages = []
+        for _ in range(count):
+            capacity, items, bits, hashes = _STAGE.unpack_from(data, offset)
+            offset += _STAGE.size
+            stage = BloomStage.__new__(BloomStage)
+            stage.capacity, stage.count, stage.bits, stage.hashes = capacity, items, bits, hashes
+            size = (bits + 7) // 8
+            stage.array = bytearray(data[offset:offset + size])
+            offset += size
+            stages.append(stage)
+        return cls(stages)
+
+
+def load(user_id: int, db: Session) -> ScalableBloomFilter:
+    row = db.query(models.SeenJobSet).filter(models.SeenJobSet.user_id == user_id).first()
+    return ScalableBloomFilter.from_bytes(row.data if row else None)
+
+
+def mark_seen(user_id: int, keys: Iterable[str], db: Session) -> List[bool]:
+    """Record jobs as shown to a user. Returns, per key, whether it was new to them."""
+    keys = list(keys)
+    if not keys:
+        return []
+    # Lock the row until commit (FOR UPDATE on Postgres), so concurrent searches by
+    # the same user add to each other's filter instead of overwriting it
+    query = db.query(models.SeenJobSet).filter(models.SeenJobSet.user_id == user_id).with_for_update()
+    row = query.first()
+    if row is None:
+        try:
+            with db.begin_nested():
+                db.add(models.SeenJobSet(user_id=user_id, item_count=0))
+        except IntegrityError:
+            pass  # Another search created it first
+        row = query.one()
+    seen = ScalableBloomFilter.from_bytes(row.data)
+    flags = [seen.add(key) for key in keys]
+    if any(flags):
+        row.data = seen.to_bytes()
+        row.item_count = len(seen)
+        row.updated_at = datetime.utcnow()
+    db.commit()
+    return flags
+
+
+def count_unseen(user_id: int, keys: Iterable[str], db: Session) -> int:
+    """How many of these jobs the user has not been shown, without recording them."""
+    seen = load(user_id, db)
+    return sum(1 for key in keys if key not in seen)
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import models
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # Seconds a cached user is trusted
+# Share invalidations between workers through the database (polled, not per request)
+USER_CACHE_SHARED_INVALIDATION = os.getenv("USER_CACHE_SHARED_INVALIDATION", "false").lower() == "true"
+USER_CACHE_POLL_INTERVAL = float(os.getenv("USER_CACHE_POLL_INTERVAL", "2"))
+USER_CACHE_INVALIDATION_RETENTION = timedelta(minutes=10)
+
+
+class UserCache:
+    """
+    Authenticated users by token subject (email), so a request with a
+    known token does not query the users table.
+
+    Entries live at most `ttl` seconds and the least recently used are
+    evicted past `maxsize`. Cached users are detached from any session
+    and shared between requests: endpoints that change a user load it
+    again (see auth.load_user_for_update) and call `invalidate` after
+    committing. With USER_CACHE_SHARED_INVALIDATION each invalidation is
+    also written to the user_cache_invalidations table, which every
+    worker polls at most once per USER_CACHE_POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # email -> (expires_at, user)
+        self._lock = threading.Lock()
+        self._last_poll = 0.0
+        self._last_invalidation_id = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, email: str, db: Optional[Session] = None) -> Optional[models.User]:
+        if USER_CACHE_SHARED_INVALIDATION and db is not None:
+            self._poll(db)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[email]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(email)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, email: str, user: models.User, db: Session):
+        """Cache a user loaded through `db`; it is detached from that session."""
+        db.expunge(user)
+        with self._lock:
+            self._entries[email] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _drop(self, email: str):
+        with self._lock:
+            if self._entries.pop(email, None) is not None:
+                self.invalidations += 1
+
+    def invalidate(self, email: str, db: Optional[Session] = None):
+        """Forget a user whose row changed (and tell other workers when configured)."""
+        self._drop(email)
+        if USER_CACHE_SHARED_INVALIDATION and db is not None:
+            try:
+                db.add(models.UserCacheInvalidation(email=email))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"User cache invalidation broadcast failed: {e}")
+
+    async def invalidate_async(self, email: str, db: AsyncSession):
+        """`invalidate` for endpoints on database.get_async_db."""
+        if USER_CACHE_SHARED_INVALIDATION:
+            await db.run_sync(lambda session: self.invalidate(email, session))
+        else:
+            self._drop(email)
+
+    def _poll(self, db: Session):
+        now = time.monotonic()
+        if now - self._last_poll < USER_CACHE_POLL_INTERVAL:
+            return
+        self._last_poll = now
+        try:
+            query = db.query(models.UserCacheInvalidation.id, models.UserCacheInvalidation.email)
+            if self._last_invalidation_id is None:
+                # First poll: earlier invalidations predate this worker's cache
+                latest = db.query(models.UserCacheInvalidation.id).order_by(models.UserCacheInvalidation.id.desc()).first()
+                self._last_invalidation_id = latest.id if latest else 0
+                return
+            for row in query.filter(models.UserCacheInvalidation.id > self._last_invalidation_id).order_by(models.UserCacheInvalidation.id):
+                self._drop(row.email)
+                self._last_invalidation_id = row.id
+            cutoff = datetime.utcnow() - USER_CACHE_INVALIDATION_RETENTION
+            db.query(models.UserCacheInvalidation).filter(models.UserCacheInvalidation.created_at < cutoff).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"User cache invalidation poll failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "shared_invalidation": USER_CACHE_SHARED_INVALIDATION,
+        }
+
+
+# Process-wide cache used by auth.get_current_user
+cache = UserCache()
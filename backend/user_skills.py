@@ -0,0 +1,108 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from suggestions import POPULAR_SKILLS
+
+# Common spellings of the same skill, by compact form (see _compact)
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "reactjs": "react",
+    "golang": "go",
+    "postgres": "postgresql",
+    "js": "javascript",
+    "ts": "typescript",
+    "vue": "vue.js",
+    "express": "express.js",
+    "node": "node.js",
+    "gcp": "google cloud",
+    "googlecloudplatform": "google cloud",
+    "amazonwebservices": "aws",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "sklearn": "scikit-learn",
+    "mui": "material-ui",
+    "rest": "rest api",
+    "restapis": "rest api",
+    "mssql": "sql server",
+    "rails": "ruby on rails",
+}
+
+_SEPARATORS_RE = re.compile(r"[\s.\-_]+")
+
+
+def _compact(name: str) -> str:
+    """Lowercase with spaces, dots, dashes and underscores removed ("Node.js" -> "nodejs")."""
+    return _SEPARATORS_RE.sub("", name.lower())
+
+
+_KNOWN = {_compact(skill): skill.lower() for skill in POPULAR_SKILLS}
+_DISPLAY = {skill.lower(): skill for skill in POPULAR_SKILLS}
+
+
+def skill_key(name: Optional[str]) -> str:
+    """Canonical form of a skill: "ReactJS", "react.js" and "React" all give "react"."""
+    key = " ".join((name or "").lower().split())
+    compact = _compact(key)
+    return SKILL_ALIASES.get(compact) or _KNOWN.get(compact) or key
+
+
+def display_name(name: str) -> str:
+    return _DISPLAY.get(skill_key(name), name.strip())
+
+
+def _skill_ids(names: Dict[str, str], db: Session) -> Dict[str, int]:
+    """Skill id per key, creating rows for keys not seen before."""
+    if not names:
+        return {}
+    ids = dict(db.query(models.Skill.key, models.Skill.id).filter(models.Skill.key.in_(names)).all())
+    for key in names.keys() - ids.keys():
+        try:
+            with db.begin_nested():
+                skill = models.Skill(key=key, name=names[key])
+                db.add(skill)
+            ids[key] = skill.id
+        except IntegrityError:
+            # Another request created it first
+            ids[key] = db.query(models.Skill.id).filter(models.Skill.key == key).scalar()
+    return ids
+
+
+def sync(user: models.User, db: Session):
+    """Make user_skills match user.skills (only the difference is written). The caller commits."""
+    names = {}
+    for name in user.skills or []:
+        if isinstance(name, str) and skill_key(name):
+            names.setdefault(skill_key(name), display_name(name))
+    wanted = set(_skill_ids(names, db).values())
+    current = {row.skill_id for row in db.query(models.UserSkill.skill_id).filter(models.UserSkill.user_id == user.id)}
+    if current - wanted:
+        db.query(models.UserSkill).filter(
+            models.UserSkill.user_id == user.id,
+            models.UserSkill.skill_id.in_(current - wanted)
+        ).delete(synchronize_session=False)
+    db.add_all(models.UserSkill(user_id=user.id, skill_id=skill_id) for skill_id in wanted - current)
+
+
+def users_with_skill(name: str, db: Session):
+    """Query of the ids of users who list a skill (any spelling), served by ix_user_skills_skill_user."""
+    return db.query(models.UserSkill.user_id).join(models.Skill, models.Skill.id == models.UserSkill.skill_id).filter(
+        models.Skill.key == skill_key(name)
+    )
+
+
+def count_users_with_skill(name: str, db: Session) -> int:
+    return users_with_skill(name, db).count()
+
+
+def popular_skills(db: Session, limit: int = 20) -> List[Tuple[str, int]]:
+    """(skill, users) for the most widely listed skills."""
+    users = func.count(models.UserSkill.user_id)
+    rows = db.query(models.Skill.name, users).join(models.UserSkill, models.UserSkill.skill_id == models.Skill.id).group_by(
+        models.Skill.id, models.Skill.name
+    ).order_by(users.desc(), models.Skill.name).limit(limit).all()
+    return [(name, count) for name, count in rows]
@@ -2,8 +2,8 @@
 
 import { useState, useEffect, Suspense } from "react";
 import { useSearchParams, useRouter } from "next/navigation";
-import { Search, MapPin, Briefcase } from "lucide-react";
-import { searchJobs, Job } from "@/lib/api";
+import { Search, MapPin, Briefcase, Bell } from "lucide-react";
+import { searchJobs, saveSearch, getSearchFacets, Job, SearchFacets } from "@/lib/api";
 import { JobCard } from "@/components/JobCard";
 import { Header } from "@/components/Header";
 
@@ -18,8 +18,10 @@ function HomeContent() {
     const [jobs, setJobs] = useState<Job[]>([]);
     const [loading, setLoading] = useState(false);
     const [hasSearched, setHasSearched] = useState(false);
-    const [page, setPage] = useState(1);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [hasMore, setHasMore] = useState(true);
+    const [alertSaved, setAlertSaved] = useState(false);
+    const [facets, setFacets] = useState<SearchFacets | null>(null);
 
     // Filters
     const [selectedExperience, setSelectedExperience] = useState<string[]>([]);
@@ -43,18 +45,17 @@ function HomeContent() {
             setQuery(q || "");
             setLocation(loc || "");
             // Trigger search immediately
-            performSearch(q || "", loc || "", 1, true);
+            performSearch(q || "", loc || "", null, true);
         }
     }, [searchParams]);
 
-    const performSearch = async (q: string, loc: string, pageNum: number, isNewSearch: boolean) => {
+    const performSearch = async (q: string, loc: string, cursor: string | null, isNewSearch: boolean) => {
         setLoading(true);
         try {
-            const start = (pageNum - 1) * 10 + 1;
-            const results = await searchJobs(
+            const { jobs: results, nextCursor: cursorForNext } = await searchJobs(
                 q,
                 loc,
-                start,
+                cursor,
                 selectedExperience,
                 selectedPlatforms,
                 selectedCompanySizes
@@ -63,11 +64,13 @@ function HomeContent() {
             if (isNewSearch) {
                 setJobs(results);
                 setHasSearched(true);
+                getSearchFacets(q, loc, selectedExperience, selectedPlatforms, selectedCompanySizes).then(setFacets);
             } else {
                 setJobs(prev => [...prev, ...results]);
             }
 
-            setHasMore(results.length >= 10);
+            setNextCursor(cursorForNext);
+            setHasMore(cursorForNext !== null);
         } catch (error) {
             console.error("Search failed", error);
         } finally {
@@ -75,8 +78,8 @@ function HomeContent() {
         }
     };
 
-    const loadJobs = async (pageNum: number, isNewSearch: boolean = false) => {
-        await performSearch(query, location, pageNum, isNewSearch);
+    const loadJobs = async (cursor: string | null, isNewSearch: boolean = false) => {
+        await performSearch(query, location, cursor, isNewSearch);
     };
 
     const handleSearch = async (e: React.FormEvent) => {
@@ -89,15 +92,34 @@ function HomeContent() {
         if (location) params.set('location', location);
         router.push(`/?${params.toString()}`);
 
-        setPage(1);
+        setNextCursor(null);
         setHasMore(true);
-        await loadJobs(1, true);
+        setAlertSaved(false);
+        await loadJobs(null, true);
+    };
+
+    // Number of matching jobs for a filter value, shown once a search has run
+    const facetCount = (facet: string, value: string) => {
+        const count = facets?.facets[facet]?.[value];
+        return count ? ` (${count})` : "";
+    };
+
+    const handleSaveSearch = async () => {
+        try {
+            await saveSearch({
+                query,
+                location,
+                experience_level: selectedExperience,
+                platforms: selectedPlatforms
+            });
+            setAlertSaved(true);
+        } catch (error) {
+            console.error("Failed to save search", error);
+        }
     };
 
     const handleShowMore = async () => {
-        const nextPage = page + 1;
-        setPage(nextPage);
-        await loadJobs(nextPage, false);
+        await loadJobs(nextCursor, false);
     };
 
     const toggleExperience = (level: string) => {
@@ -240,7 +262,7 @@ function HomeContent() {
                                                 checked={selectedExperience.includes(level)}
                                                 onChange={() => toggleExperience(level)}
                                             />
-                                            <span className={`text-sm ${selectedExperience.includes(level) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{level}</span>
+                                            <span className={`text-sm ${selectedExperience.includes(level) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{level}{facetCount("experience", level)}</span>
                                         </label>
                                     ))}
                                 </div>
@@ -261,7 +283,7 @@ function HomeContent() {
                                                 checked={selectedPlatforms.includes(platform)}
                                                 onChange={() => togglePlatform(platform)}
                                             />
-                                            <span className={`text-sm ${selectedPlatforms.includes(platform) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{platform}</span>
+                                            <span className={`text-sm ${selectedPlatforms.includes(platform) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{platform}{facetCount("source", platform)}</span>
                                         </label>
                                     ))}
                                 </div>
@@ -282,7 +304,7 @@ function HomeContent() {
                                                 checked={selectedCompanySizes.includes(size)}
                                                 onChange={() => toggleCompanySize(size)}
                                             />
-                                            <span className={`text-sm ${selectedCompanySizes.includes(size) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{size}</span>
+                                            <span className={`text-sm ${selectedCompanySizes.includes(size) ? 'text-slate-900 dark:text-white' : 'text-slate-500 dark:text-blue-200/60 group-hover:text-blue-600 dark:group-hover:text-blue-200'}`}>{size}{facetCount("company_size", size)}</span>
                                         </label>
                                     ))}
                                 </div>
@@ -296,6 +318,16 @@ function HomeContent() {
             <div className="max-w-7xl mx-auto px-4 py-12 sm:px-6 lg:px-8">
                 {jobs.length > 0 ? (
                     <>
+                        <div className="flex justify-end mb-6">
+                            <button
+                                onClick={handleSaveSearch}
+                                disabled={alertSaved || !query.trim()}
+                                className="inline-flex items-center px-4 py-2 bg-white dark:bg-white/5 hover:bg-slate-50 dark:hover:bg-white/10 border border-slate-200 dark:border-white/10 rounded-xl text-sm text-slate-600 dark:text-blue-200 font-medium transition-all disabled:opacity-50 shadow-sm dark:shadow-none"
+                            >
+                                <Bell className="w-4 h-4 mr-2" />
+                                {alertSaved ? "Job Alert Saved" : "Save as Job Alert"}
+                            </button>
+                        </div>
                         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
                             {jobs.map((job, index) => (
                                 <JobCard key={`${job.id || 'job'}-${index}`} job={job} />
@@ -49,7 +49,7 @@ export function Header() {
             }
 
             try {
-                const userData = await getProfile();
+                const userData = await getProfile(['email', 'full_name', 'avatar']);
                 setUser(userData);
             } catch (e: any) {
                 console.error("Failed to fetch user for header", e);
@@ -11,7 +11,9 @@ interface JobCardProps {
 }
 
 export function JobCard({ job, className, onMissingInfo }: JobCardProps) {
-    const [isSaved, setIsSaved] = useState(false);
+    // Set by /search when the job is already in the user's tracker
+    const [trackedStatus, setTrackedStatus] = useState<string | null>(job.application_status || null);
+    const isSaved = trackedStatus !== null;
     const [isSaving, setIsSaving] = useState(false);
 
     const handleSave = async (e: React.MouseEvent) => {
@@ -21,7 +23,8 @@ export function JobCard({ job, className, onMissingInfo }: JobCardProps) {
 
         setIsSaving(true);
         try {
-            await createApplication({
+            const application = await createApplication({
+                job_id: job.id,
                 job_title: job.title,
                 company: job.company,
                 location: job.location,
@@ -30,7 +33,7 @@ export function JobCard({ job, className, onMissingInfo }: JobCardProps) {
                 status: 'Saved',
                 salary: job.salary
             });
-            setIsSaved(true);
+            setTrackedStatus(application.status);
         } catch (e) {
             console.error("Failed to save", e);
         } finally {
@@ -50,9 +53,16 @@ export function JobCard({ job, className, onMissingInfo }: JobCardProps) {
                         <span className="font-medium">{job.company}</span>
                     </div>
                 </div>
-                <span className="px-3 py-1 text-xs font-medium text-blue-700 dark:text-blue-300 bg-blue-100 dark:bg-blue-500/10 border border-blue-200 dark:border-blue-500/20 rounded-full">
-                    {job.source}
-                </span>
+                <div className="flex items-center gap-2">
+                    {job.is_new && (
+                        <span className="px-2 py-1 text-xs font-semibold text-green-700 dark:text-green-300 bg-green-100 dark:bg-green-500/10 border border-green-200 dark:border-green-500/20 rounded-full">
+                            New
+                        </span>
+                    )}
+                    <span className="px-3 py-1 text-xs font-medium text-blue-700 dark:text-blue-300 bg-blue-100 dark:bg-blue-500/10 border border-blue-200 dark:border-blue-500/20 rounded-full">
+                        {job.source}
+                    </span>
+                </div>
             </div>
 
             <div className="flex flex-wrap gap-3 mb-4 text-sm text-slate-600 dark:text-blue-200/60">
@@ -91,7 +101,7 @@ export function JobCard({ job, className, onMissingInfo }: JobCardProps) {
                     )}
                 >
                     {isSaved ? <Check className="w-4 h-4 mr-2" /> : <Bookmark className="w-4 h-4 mr-2" />}
-                    {isSaved ? "Saved" : "Track"}
+                    {trackedStatus ?? "Track"}
                 </button>
 
                 <a
@@ -30,6 +30,15 @@ axios.interceptors.response.use(
     }
 );
 
+export interface JobMatch {
+    score: number;
+    relevance: number;
+    skills: number;
+    experience_fit: number;
+    preference: number;
+    matched_skills: string[];
+}
+
 export interface Job {
     id?: string;
     title: string;
@@ -40,6 +49,10 @@ export interface Job {
     source: string;
     posted_date?: string;
     salary?: string;
+    match?: JobMatch;  // Present when results were personalized for the signed-in user
+    similarity?: number;  // Profile / similar-job match score (cosine, 0-1)
+    is_new?: boolean;  // Not shown to the signed-in user before
+    application_status?: string;  // Status in the signed-in user's tracker
 }
 
 export interface User {
@@ -72,31 +85,105 @@ export const getNotifications = async (): Promise<any[]> => {
     }
 };
 
+export interface JobSearchPage {
+    jobs: Job[];
+    nextCursor: string | null;  // Pass back to fetch the following page; null when there are no more
+}
+
 export const searchJobs = async (
     query: string,
     location: string = '',
-    start: number = 1,
+    cursor: string | null = null,
     experienceLevel: string[] = [],
     platforms: string[] = [],
     companySize: string[] = []
-): Promise<Job[]> => {
+): Promise<JobSearchPage> => {
     try {
         const response = await axios.post(`${API_URL}/search`, {
             query,
             location,
             limit: 10,
-            start,
+            cursor,
+            experience_level: experienceLevel,
+            platforms,
+            company_size: companySize,
+            personalize: !!localStorage.getItem('token')
+        });
+        return { jobs: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+    } catch (error) {
+        console.error("Error searching jobs:", error);
+        return { jobs: [], nextCursor: null };
+    }
+};
+
+export const getJobsForMe = async (location: string = '', limit: number = 20): Promise<Job[]> => {
+    const response = await axios.get(`${API_URL}/jobs/for-me`, { params: { location, limit } });
+    return response.data;
+};
+
+export const getSimilarJobs = async (job: { id?: string; job_id?: string; url?: string; job_url?: string }, limit: number = 10): Promise<Job[]> => {
+    const response = await axios.get(`${API_URL}/jobs/similar`, {
+        params: { job_id: job.id || job.job_id, url: job.url || job.job_url, limit }
+    });
+    return response.data;
+};
+
+export interface SearchFacets {
+    total: number;
+    facets: Record<string, Record<string, number>>;  // facet -> value -> number of matching jobs
+}
+
+export const getSearchFacets = async (
+    query: string,
+    location: string = '',
+    experienceLevel: string[] = [],
+    platforms: string[] = [],
+    companySize: string[] = []
+): Promise<SearchFacets | null> => {
+    try {
+        const response = await axios.post(`${API_URL}/search/facets`, {
+            query,
+            location,
             experience_level: experienceLevel,
             platforms,
             company_size: companySize
         });
         return response.data;
     } catch (error) {
-        console.error("Error searching jobs:", error);
-        return [];
+        console.error("Error fetching search facets:", error);
+        return null;
     }
 };
 
+export interface SavedSearch {
+    id: number;
+    query: string;
+    location?: string;
+    experience_level?: string[];
+    platforms?: string[];
+    created_at: string;
+    new_matches: number;
+}
+
+export const getSavedSearches = async (): Promise<SavedSearch[]> => {
+    const response = await axios.get(`${API_URL}/saved-searches`);
+    return response.data;
+};
+
+export const saveSearch = async (search: { query: string; location?: string; experience_level?: string[]; platforms?: string[] }): Promise<SavedSearch> => {
+    const response = await axios.post(`${API_URL}/saved-searches`, search);
+    return response.data;
+};
+
+export const getSavedSearchMatches = async (id: number): Promise<Job[]> => {
+    const response = await axios.get(`${API_URL}/saved-searches/${id}/matches`);
+    return response.data;
+};
+
+export const deleteSavedSearch = async (id: number): Promise<void> => {
+    await axios.delete(`${API_URL}/saved-searches/${id}`);
+};
+
 export const login = async (email: string, password: string): Promise<{ access_token: string }> => {
     const formData = new FormData();
     formData.append('username', email);
@@ -114,13 +201,18 @@ export const register = async (email: string, password: string, fullName: string
     return response.data;
 };
 
-export const getProfile = async (): Promise<User> => {
-    const response = await axios.get(`${API_URL}/users/me`);
+// Pass `fields` to fetch only part of the profile (id is always included).
+// Responses carry an ETag, so the browser revalidates and gets 304s while the profile is unchanged.
+export const getProfile = async (fields?: (keyof User)[]): Promise<User> => {
+    const response = await axios.get(`${API_URL}/users/me`, {
+        params: fields ? { fields: fields.join(',') } : undefined
+    });
     return response.data;
 };
 
+// Only the fields present in `data` are written
 export const updateProfile = async (data: Partial<User>): Promise<User> => {
-    const response = await axios.put(`${API_URL}/users/me`, data);
+    const response = await axios.patch(`${API_URL}/users/me`, data);
     return response.data;
 };
 